@@ -0,0 +1,76 @@
+# python
+# File: benchmarks/compact_rows_bench.py
+"""
+Memory benchmark: list of dict rows (as returned in resp.data) versus
+ColumnarRows for a results export.
+
+    python -m benchmarks.compact_rows_bench --rows 1000000
+"""
+import argparse
+import gc
+import random
+import sys
+import tracemalloc
+import uuid
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.compact import ColumnarRows  # noqa: E402
+from models.schema import RESULT_COLUMNS  # noqa: E402
+
+
+def generate_rows(count: int, students: int = 5000, assignments: int = 200):
+    rng = random.Random(42)
+    student_pool = [(str(uuid.UUID(int=rng.getrandbits(128))), f"Student {i}") for i in range(students)]
+    assignment_pool = [(i + 1, f"Assignment {i + 1}") for i in range(assignments)]
+    grades = ["A", "B", "C", "FAIL"]
+    for i in range(count):
+        student_id, student_name = rng.choice(student_pool)
+        assignment_id, assignment_title = rng.choice(assignment_pool)
+        # Copy strings so each row owns its values, as JSON decoding produces.
+        yield {
+            "result_id": i + 1,
+            "course_id": 1 + i % 20,
+            "assignment_id": assignment_id,
+            "assignment_title": "".join(assignment_title),
+            "student_id": "".join(student_id),
+            "student_name": "".join(student_name),
+            "result": "".join(rng.choice(grades)),
+        }
+
+
+def measure(build):
+    gc.collect()
+    tracemalloc.start()
+    container = build()
+    gc.collect()
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return container, current
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--rows", type=int, default=1_000_000)
+    args = parser.parse_args()
+
+    dicts, dict_bytes = measure(lambda: list(generate_rows(args.rows)))
+    del dicts
+    compact, compact_bytes = measure(lambda: _build_compact(args.rows))
+    assert len(compact) == args.rows
+
+    print(f"rows:            {args.rows:,}")
+    print(f"list[dict]:      {dict_bytes / 2**20:10.1f} MiB  ({dict_bytes / args.rows:6.1f} B/row)")
+    print(f"ColumnarRows:    {compact_bytes / 2**20:10.1f} MiB  ({compact_bytes / args.rows:6.1f} B/row)")
+    print(f"reduction:       {dict_bytes / max(compact_bytes, 1):10.1f}x")
+
+
+def _build_compact(count: int) -> ColumnarRows:
+    rows = ColumnarRows(RESULT_COLUMNS)
+    rows.extend(generate_rows(count))
+    return rows
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,108 @@
+# python
+# File: benchmarks/encoding_bench.py
+"""
+Bytes on the wire and CPU per response format, for list payloads shaped
+like the materials and feedback listings. "serialize" encodes straight from
+Python objects; "middleware" starts from the JSON body the route produced,
+as NegotiatedEncodingMiddleware does on a cache miss.
+
+    python -m benchmarks.encoding_bench
+"""
+import argparse
+import json
+import random
+import sys
+import time
+from datetime import datetime, timedelta
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from utils.encoding import encode_body, brotli, msgpack  # noqa: E402
+
+FORMATS = [
+    ("json", None),
+    ("json", "gzip"),
+    ("json", "br"),
+    ("msgpack", None),
+    ("msgpack", "gzip"),
+    ("msgpack", "br"),
+]
+
+
+def materials(count: int):
+    rng = random.Random(7)
+    start = datetime(2025, 1, 1)
+    return [
+        {
+            "material_id": i + 1,
+            "course_id": 1 + i % 12,
+            "material_title": f"Lecture {i % 40 + 1}: {rng.choice(['Intro', 'Recursion', 'Graphs', 'Sorting'])}",
+            "file_path": f"https://example.supabase.co/storage/v1/object/course-files/courses/{1 + i % 12}/materials/{rng.getrandbits(64):016x}.pdf",
+            "upload_date": (start + timedelta(minutes=17 * i)).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def feedback(count: int):
+    rng = random.Random(11)
+    words = "clear helpful pace examples slides confusing great more practice exercises please".split()
+    return [
+        {
+            "feedback_id": i + 1,
+            "student_id": f"{rng.getrandbits(128):032x}",
+            "course_id": 1 + i % 12,
+            "comment": " ".join(rng.choice(words) for _ in range(rng.randint(4, 30))),
+            "created_at": datetime(2025, 3, 1, 12, i % 60).isoformat(),
+        }
+        for i in range(count)
+    ]
+
+
+def measure(payload, fmt: str, encoding, repeat: int):
+    """
+    Returns (encoded bytes, serialize+compress CPU from Python objects,
+    CPU for the middleware path which starts from the JSON body).
+    """
+    start = time.process_time()
+    for _ in range(repeat):
+        if fmt == "msgpack":
+            raw = msgpack.packb(payload, use_bin_type=True)
+        else:
+            raw = json.dumps(payload, separators=(",", ":")).encode()
+        encoded = encode_body(raw, "json", encoding)
+    direct = (time.process_time() - start) / repeat * 1e6
+
+    body = json.dumps(payload, separators=(",", ":")).encode()
+    start = time.process_time()
+    for _ in range(repeat):
+        encode_body(body, fmt, encoding)
+    middleware = (time.process_time() - start) / repeat * 1e6
+    return len(encoded), direct, middleware
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Response encoding benchmark")
+    parser.add_argument("--sizes", default="10,100,1000,10000")
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    formats = [(fmt, enc) for fmt, enc in FORMATS
+               if not (fmt == "msgpack" and msgpack is None) and not (enc == "br" and brotli is None)]
+
+    print(f"{'payload':10} {'rows':>6} {'format':14} {'bytes':>10} {'ratio':>6} {'serialize us':>13} {'middleware us':>14}")
+    for name, factory in (("materials", materials), ("feedback", feedback)):
+        for rows in (int(size) for size in args.sizes.split(",")):
+            payload = factory(rows)
+            json_size = len(json.dumps(payload, separators=(",", ":")).encode())
+            repeat = max(1, args.repeat * 100 // max(rows, 100))
+            for fmt, encoding in formats:
+                size, direct, middleware = measure(payload, fmt, encoding, repeat)
+                label = fmt + (f"+{encoding}" if encoding else "")
+                print(f"{name:10} {rows:6d} {label:14} {size:10d} {size / json_size:6.2f} {direct:13.1f} {middleware:14.1f}")
+            print()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,51 @@
-
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, Depends
-from routers import teacher
+from routers import teacher, admin
 from utils.auth import verify_teacher
+from utils.jobs import job_queue
+from utils.audit import audit
+from utils.encoding import NegotiatedEncodingMiddleware
+from utils.profiler import ProfilerMiddleware, profiler, PROFILER_ENABLED
+from utils.database import QUERY_ADVISOR, READ_YOUR_WRITES_SECONDS, REPLICA_MAX_LAG_SECONDS
+from utils.read_routing import ReadYourWritesMiddleware
+from services.prefetch_service import prefetcher, PREFETCH_ENABLED
+from services.student_directory import student_directory
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    audit.start()
+    if PROFILER_ENABLED:
+        profiler.start()
+    if PREFETCH_ENABLED:
+        prefetcher.start()
+    student_directory.start()
+    yield
+    await student_directory.stop()
+    await prefetcher.stop()
+    profiler.stop()
+    job_queue.shutdown()
+    audit.stop()
+    if QUERY_ADVISOR:
+        from utils.query_advisor import recorder
+        recorder.log_report()
+
 
 app = FastAPI(
     title="Teacher Management API",
     description="API for managing teacher-related tasks in the Learning Management System.",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan
 )
 
+app.add_middleware(NegotiatedEncodingMiddleware)
+app.add_middleware(ProfilerMiddleware)
+app.add_middleware(ReadYourWritesMiddleware, max_age=int(max(READ_YOUR_WRITES_SECONDS, REPLICA_MAX_LAG_SECONDS)) + 1)
+
 app.include_router(teacher.router, dependencies=[Depends(verify_teacher)])
+app.include_router(admin.router)
 
 
 @app.get("/")
 def read_root():
     return {"message": "Welcome to the Teacher Management API"}
-
@@ -0,0 +1,16 @@
+-- 001_sync_log.sql
+-- Change log backing the delta sync endpoint (GET /sync/changes).
+-- Every write to modules, course_materials and assignments appends a row here;
+-- deletes are kept as tombstones so clients can drop rows they have cached.
+
+create table if not exists sync_log (
+    change_id   bigserial primary key,
+    table_name  text        not null,
+    row_id      bigint      not null,
+    course_id   bigint,
+    teacher_id  text,
+    op          text        not null check (op in ('upsert', 'delete')),
+    changed_at  timestamptz not null default now()
+);
+
+create index if not exists sync_log_course_change_idx on sync_log (course_id, change_id);
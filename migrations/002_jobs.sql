@@ -0,0 +1,17 @@
+-- 002_jobs.sql
+-- Job state for the background job queue when JOB_STORE=supabase.
+
+create table if not exists jobs (
+    job_id      text        primary key,
+    kind        text        not null,
+    teacher_id  text        not null,
+    status      text        not null default 'queued',
+    processed   integer     not null default 0,
+    total       integer     not null default 0,
+    error       text,
+    result      jsonb,
+    created_at  timestamptz not null default now(),
+    finished_at timestamptz
+);
+
+create index if not exists jobs_teacher_idx on jobs (teacher_id, created_at desc);
@@ -0,0 +1,35 @@
+-- 003_query_indexes.sql
+-- Composite indexes matching the filters issued by services/.
+-- Equality columns come first, then the range/sort column where one is used.
+
+-- get_modules_logic: modules.course_id = ? and teacher_id = ?
+create index if not exists modules_course_teacher_idx on modules (course_id, teacher_id);
+
+-- get_materials_by_module_logic: course_materials.module_id = ?
+create index if not exists course_materials_module_idx on course_materials (module_id);
+
+-- get_material_by_title_logic: course_materials.course_id = ? and material_title = ?
+-- (also serves course_id-only lookups from sync snapshots)
+create index if not exists course_materials_course_title_idx on course_materials (course_id, material_title);
+
+-- upload_results_logic: assignments.assignment_title = ? and course_id = ?
+create index if not exists assignments_course_title_idx on assignments (course_id, assignment_title);
+
+-- get_assignments_by_module_logic: assignments.module_id = ?
+create index if not exists assignments_module_idx on assignments (module_id);
+
+-- dashboard pending assignments: course_id in (...) and due_date >= now() order by due_date
+create index if not exists assignments_course_due_idx on assignments (course_id, due_date);
+
+-- get_teacher_courses_logic: course.teacher_ids = ?
+create index if not exists course_teacher_ids_idx on course (teacher_ids);
+
+-- review_feedback_logic / dashboard: feedback.course_id = ? order by created_at desc
+create index if not exists feedback_course_created_idx on feedback (course_id, created_at desc);
+
+-- live_classes.course_id = ? order by start_time (the dashboard's end_time
+-- filter is served by 007's (course_id, end_time) index)
+create index if not exists live_classes_course_start_idx on live_classes (course_id, start_time);
+
+-- export_results_logic: results.course_id = ? order by result_id
+create index if not exists results_course_result_idx on results (course_id, result_id);
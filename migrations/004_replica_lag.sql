@@ -0,0 +1,15 @@
+-- 004_replica_lag.sql
+-- Lets the API measure replica lag over PostgREST: rpc('replica_lag_seconds').
+-- Returns 0 on the primary, where pg_last_xact_replay_timestamp() is null.
+
+create or replace function replica_lag_seconds()
+returns double precision
+language sql
+stable
+as $$
+    select case
+        when not pg_is_in_recovery() then 0
+        when pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() then 0
+        else coalesce(extract(epoch from now() - pg_last_xact_replay_timestamp()), 0)
+    end;
+$$;
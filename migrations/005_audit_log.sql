@@ -0,0 +1,18 @@
+-- 005_audit_log.sql
+-- Audit trail of who changed which module, material, assignment or grade.
+-- Written in batches by utils/audit.py; `audit.shed` rows record events
+-- dropped under load.
+
+create table if not exists audit_log (
+    audit_id    bigserial   primary key,
+    actor       text,
+    action      text        not null,
+    table_name  text,
+    row_id      text,
+    course_id   bigint,
+    detail      jsonb,
+    created_at  timestamptz not null default now()
+);
+
+create index if not exists audit_log_course_created_idx on audit_log (course_id, created_at desc);
+create index if not exists audit_log_actor_created_idx on audit_log (actor, created_at desc);
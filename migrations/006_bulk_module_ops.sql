@@ -0,0 +1,115 @@
+-- 006_bulk_module_ops.sql
+-- Set-based module operations, each one transaction via rpc():
+--   bulk_delete_modules  - delete modules together with their materials and assignments
+--   move_module_items    - move materials/assignments into another module of the same course
+--   reorder_modules      - set modules.position from an ordered id list
+-- Each re-checks ownership inside the transaction and returns affected ids
+-- (with course_id) so the API can record sync tombstones and audit events.
+
+alter table modules add column if not exists position integer;
+create index if not exists modules_course_position_idx on modules (course_id, position);
+
+create or replace function bulk_delete_modules(p_teacher_id text, p_module_ids bigint[])
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_owned integer;
+    v_materials jsonb;
+    v_assignments jsonb;
+    v_modules jsonb;
+begin
+    select count(*) into v_owned
+    from modules where module_id = any(p_module_ids) and teacher_id = p_teacher_id;
+    if v_owned <> cardinality(array(select distinct unnest(p_module_ids))) then
+        raise exception 'Access denied to one or more modules' using errcode = '42501';
+    end if;
+
+    with d as (delete from course_materials where module_id = any(p_module_ids) returning material_id, course_id)
+    select coalesce(jsonb_agg(jsonb_build_object('id', material_id, 'course_id', course_id)), '[]') into v_materials from d;
+
+    with d as (delete from assignments where module_id = any(p_module_ids) returning assignment_id, course_id)
+    select coalesce(jsonb_agg(jsonb_build_object('id', assignment_id, 'course_id', course_id)), '[]') into v_assignments from d;
+
+    with d as (delete from modules where module_id = any(p_module_ids) returning module_id, course_id)
+    select coalesce(jsonb_agg(jsonb_build_object('id', module_id, 'course_id', course_id)), '[]') into v_modules from d;
+
+    return jsonb_build_object('modules', v_modules, 'course_materials', v_materials, 'assignments', v_assignments);
+end;
+$$;
+
+create or replace function move_module_items(
+    p_teacher_id text, p_target_module_id bigint, p_material_ids bigint[], p_assignment_ids bigint[]
+)
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_course_id bigint;
+    v_materials jsonb;
+    v_assignments jsonb;
+begin
+    select course_id into v_course_id
+    from modules where module_id = p_target_module_id and teacher_id = p_teacher_id;
+    if v_course_id is null then
+        raise exception 'Access denied to target module' using errcode = '42501';
+    end if;
+
+    -- Items must already belong to the target's course, either unlinked or
+    -- in another module the teacher owns.
+    if exists (
+        select 1 from course_materials m
+        left join modules src on src.module_id = m.module_id
+        where m.material_id = any(p_material_ids)
+          and (m.course_id <> v_course_id or (m.module_id is not null and src.teacher_id <> p_teacher_id))
+    ) or exists (
+        select 1 from assignments a
+        left join modules src on src.module_id = a.module_id
+        where a.assignment_id = any(p_assignment_ids)
+          and (a.course_id <> v_course_id or (a.module_id is not null and src.teacher_id <> p_teacher_id))
+    ) then
+        raise exception 'Items must belong to the target module''s course' using errcode = '42501';
+    end if;
+
+    with u as (
+        update course_materials set module_id = p_target_module_id
+        where material_id = any(p_material_ids) returning material_id, course_id
+    )
+    select coalesce(jsonb_agg(jsonb_build_object('id', material_id, 'course_id', course_id)), '[]') into v_materials from u;
+
+    with u as (
+        update assignments set module_id = p_target_module_id
+        where assignment_id = any(p_assignment_ids) returning assignment_id, course_id
+    )
+    select coalesce(jsonb_agg(jsonb_build_object('id', assignment_id, 'course_id', course_id)), '[]') into v_assignments from u;
+
+    return jsonb_build_object('course_materials', v_materials, 'assignments', v_assignments);
+end;
+$$;
+
+create or replace function reorder_modules(p_teacher_id text, p_course_id bigint, p_module_ids bigint[])
+returns jsonb
+language plpgsql
+as $$
+declare
+    v_modules jsonb;
+begin
+    if exists (
+        select 1 from unnest(p_module_ids) as ids(module_id)
+        left join modules m on m.module_id = ids.module_id
+        where m.module_id is null or m.teacher_id <> p_teacher_id or m.course_id <> p_course_id
+    ) then
+        raise exception 'Access denied to one or more modules' using errcode = '42501';
+    end if;
+
+    with u as (
+        update modules m set position = ids.ord
+        from unnest(p_module_ids) with ordinality as ids(module_id, ord)
+        where m.module_id = ids.module_id
+        returning m.module_id, m.course_id
+    )
+    select coalesce(jsonb_agg(jsonb_build_object('id', module_id, 'course_id', course_id)), '[]') into v_modules from u;
+
+    return jsonb_build_object('modules', v_modules);
+end;
+$$;
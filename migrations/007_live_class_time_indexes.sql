@@ -0,0 +1,10 @@
+-- 007_live_class_time_indexes.sql
+-- live_classes time-window lookups that 003's (course_id, start_time) index
+-- cannot seek on.
+
+-- prefetch scheduler: start_time <= ? and end_time >= ? (no course filter)
+create index if not exists live_classes_start_end_idx on live_classes (start_time, end_time);
+
+-- dashboard upcoming classes: course_id in (...) and end_time >= now() order by start_time
+-- calendar build: course_id in (...) and start_time < ? and end_time >= ?
+create index if not exists live_classes_course_end_idx on live_classes (course_id, end_time);
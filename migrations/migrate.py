@@ -0,0 +1,66 @@
+# python
+# File: migrations/migrate.py
+"""
+Apply pending SQL migrations in version order and record them in
+schema_migrations.
+
+    DATABASE_URL=postgresql://... python -m migrations.migrate
+
+Requires psycopg (v3), which is a development dependency only.
+"""
+import os
+import re
+import sys
+from pathlib import Path
+from typing import List, Tuple
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent
+_VERSION_RE = re.compile(r"^(\d+)_.*\.sql$")
+
+
+def list_migrations() -> List[Tuple[str, Path]]:
+    found = []
+    for path in MIGRATIONS_DIR.iterdir():
+        match = _VERSION_RE.match(path.name)
+        if match:
+            found.append((match.group(1), path))
+    return sorted(found)
+
+
+def apply_pending(conn) -> List[str]:
+    applied = []
+    with conn.cursor() as cur:
+        cur.execute(
+            "create table if not exists schema_migrations ("
+            " version text primary key, applied_at timestamptz not null default now())"
+        )
+        cur.execute("select version from schema_migrations")
+        done = {row[0] for row in cur.fetchall()}
+    conn.commit()
+
+    for version, path in list_migrations():
+        if version in done:
+            continue
+        with conn.cursor() as cur:
+            cur.execute(path.read_text())
+            cur.execute("insert into schema_migrations (version) values (%s)", (version,))
+        conn.commit()
+        applied.append(path.name)
+    return applied
+
+
+def main() -> None:
+    try:
+        import psycopg
+    except ImportError:
+        sys.exit("psycopg is required: pip install 'psycopg[binary]'")
+    dsn = os.getenv("DATABASE_URL")
+    if not dsn:
+        sys.exit("DATABASE_URL must be set")
+    with psycopg.connect(dsn) as conn:
+        applied = apply_pending(conn)
+    print("\n".join(applied) if applied else "No pending migrations.")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,5 +1,5 @@
 from pydantic import BaseModel, Field
-from typing import Optional
+from typing import Optional, List
 from datetime import datetime, date
 from enum import Enum
 from uuid import UUID
@@ -41,6 +41,20 @@ class Result(BaseModel):
     result: Grade
 
 
+# ColumnarRows schema for Result rows (utils/compact.py). Titles, student
+# ids/names and grades repeat across rows, so they are dictionary-encoded;
+# ids are packed into integer arrays.
+RESULT_COLUMNS = {
+    "result_id": "int",
+    "course_id": "int",
+    "assignment_id": "int",
+    "assignment_title": "enum",
+    "student_id": "enum",
+    "student_name": "enum",
+    "result": "enum",
+}
+
+
 class LiveClassCreate(BaseModel):
     course_id: int
     title: str
@@ -74,3 +88,77 @@ class Module(BaseModel):
     teacher_id: str
     module_name: str
     module_description: Optional[str] = None
+    position: Optional[int] = None
+
+
+class JobStatus(Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    SUCCEEDED = "succeeded"
+    FAILED = "failed"
+
+
+class Job(BaseModel):
+    job_id: str
+    kind: str
+    teacher_id: str
+    status: JobStatus = JobStatus.QUEUED
+    processed: int = 0
+    total: int = 0
+    error: Optional[str] = None
+    result: Optional[dict] = None
+    created_at: datetime = Field(default_factory=datetime.utcnow)
+    finished_at: Optional[datetime] = None
+
+
+class BulkResultItem(BaseModel):
+    assignment_title: str
+    student_id: UUID
+    result: Grade
+
+
+class BulkResultsRequest(BaseModel):
+    course_id: int
+    results: List[BulkResultItem]
+
+
+class BulkMaterialItem(BaseModel):
+    material_title: str
+    file_link: str
+
+
+class BulkMaterialsRequest(BaseModel):
+    course_id: int
+    module_id: Optional[int] = None
+    materials: List[BulkMaterialItem]
+
+
+class BulkModuleDeleteRequest(BaseModel):
+    module_ids: List[int]
+
+
+class ModuleItemsMoveRequest(BaseModel):
+    material_ids: List[int] = []
+    assignment_ids: List[int] = []
+
+
+class ModuleReorderRequest(BaseModel):
+    course_id: int
+    module_ids: List[int]
+
+
+class BatchOperation(BaseModel):
+    id: str
+    op: str
+    args: dict = Field(default_factory=dict)
+    depends_on: List[str] = Field(default_factory=list)
+
+
+class BatchRequest(BaseModel):
+    operations: List[BatchOperation]
+
+
+class ProfilerConfig(BaseModel):
+    enabled: Optional[bool] = None
+    interval_ms: Optional[float] = None
+    threshold_ms: Optional[float] = None
@@ -0,0 +1,78 @@
+# FILE: Teacher-Management-API/routers/admin.py
+
+# --- Imports ---
+from fastapi import APIRouter, Depends, HTTPException
+from fastapi.responses import PlainTextResponse
+from typing import List, Optional, Dict, Any
+from models.schema import ProfilerConfig
+from utils.auth import verify_admin
+from utils.profiler import profiler
+from utils.database import QUERY_ADVISOR
+from services.prefetch_service import get_prefetch_status_logic
+# --- End Imports ---
+
+# --- Create the router instance ---
+router = APIRouter(
+    prefix="/admin",
+    tags=["Admin"],
+    # Operational endpoints: guarded by ADMIN_TOKEN, not the teacher role
+    dependencies=[Depends(verify_admin)]
+)
+# --- End router creation ---
+
+# === Profiler ===
+@router.get("/profiler", response_model=Dict[str, Any])
+async def get_profiler_status():
+    """Get profiler state and settings."""
+    return profiler.status()
+
+@router.post("/profiler", response_model=Dict[str, Any])
+async def configure_profiler(config: ProfilerConfig):
+    """Enable/disable the sampling profiler or change its interval and slow-request threshold."""
+    return profiler.configure(config.enabled, config.interval_ms, config.threshold_ms)
+
+@router.get("/profiler/captures", response_model=List[Dict[str, Any]])
+async def list_profiler_captures():
+    """List captured slow requests, newest last."""
+    return [
+        {key: value for key, value in capture.items() if key not in ("samples", "db_calls")}
+        | {"db_call_count": len(capture["db_calls"]), "sample_count": sum(capture["samples"].values())}
+        for capture in list(profiler.captures)
+    ]
+
+@router.get("/profiler/captures/{capture_id}", response_model=Dict[str, Any])
+async def get_profiler_capture(capture_id: int):
+    """Get one slow request with its database calls and sampled stacks."""
+    capture = profiler.get_capture(capture_id)
+    if capture is None:
+        raise HTTPException(status_code=404, detail="Capture not found")
+    return capture
+
+@router.get("/profiler/flamegraph", response_class=PlainTextResponse)
+async def get_flamegraph(capture_id: Optional[int] = None):
+    """Folded stacks for flamegraph.pl or speedscope; all samples, or one capture's."""
+    folded = profiler.folded(capture_id)
+    if folded is None:
+        raise HTTPException(status_code=404, detail="Capture not found")
+    return folded
+
+@router.delete("/profiler/captures")
+async def clear_profiler_data():
+    """Discard collected samples and captures."""
+    profiler.reset()
+    return {"message": "Profiler data cleared"}
+
+# === Query Advisor ===
+@router.get("/query-advisor", response_model=List[Dict[str, Any]])
+async def get_query_advisor_report():
+    """Recorded query patterns and their supporting indexes (requires QUERY_ADVISOR=1)."""
+    if not QUERY_ADVISOR:
+        raise HTTPException(status_code=404, detail="Query advisor is not enabled")
+    from utils.query_advisor import recorder
+    return recorder.report()
+
+# === Prefetch ===
+@router.get("/prefetch", response_model=Dict[str, Any])
+async def get_prefetch_status():
+    """Get the live-class prefetch scheduler state and cached courses."""
+    return get_prefetch_status_logic()
@@ -2,8 +2,12 @@
 
 # --- Imports ---
 from fastapi import APIRouter, Depends, Form, Request, UploadFile, HTTPException
+from fastapi.responses import StreamingResponse, Response
 from typing import List, Optional, Dict, Any
-from models.schema import Module, CourseMaterial, Assignment, Grade # Added Grade
+from models.schema import (
+    Module, CourseMaterial, Assignment, Grade, Result, Job, BulkResultsRequest, BulkMaterialsRequest,
+    BulkModuleDeleteRequest, ModuleItemsMoveRequest, ModuleReorderRequest, BatchRequest
+) # Added Grade
 from datetime import datetime, date # Added date
 from uuid import UUID
 from utils.auth import verify_teacher # Use the function from your auth utils
@@ -13,9 +17,23 @@ from services.module_service import (
     create_module_logic,
     get_modules_logic,
     update_module_logic,
-    delete_module_logic
+    delete_module_logic,
+    bulk_delete_modules_logic,
+    move_module_items_logic,
+    reorder_modules_logic
 )
 from services.course_service import get_teacher_courses_logic
+from services.dashboard_service import get_dashboard_logic
+from services.results_service import export_results_logic
+from services.student_directory import get_student_directory_stats_logic
+from services.batch_service import run_batch_logic
+from services.calendar_service import get_calendar_logic, get_calendar_ical_logic
+from services.upload_service import (
+    upload_material_file_logic,
+    upload_assignment_file_logic,
+    create_upload_url_logic,
+    resolve_uploaded_object
+)
 from services.materials_service import (
     get_materials_by_module_logic,
     get_material_by_title_logic,
@@ -28,6 +46,14 @@ from services.assignments_service import (
     upload_assignment_logic
     # Note: No update/delete assignment logic imported, assuming not needed based on original router
 )
+from services.sync_service import get_changes_logic
+from services.events_service import subscribe_course_events_logic, event_stream
+from services.jobs_service import (
+    submit_bulk_results_logic,
+    submit_bulk_materials_logic,
+    get_job_logic,
+    get_job_result_logic
+)
 # Import services needed for additional routes (add if missing)
 # from services.results_service import upload_results_logic # Add if you implement result upload
 # from services.attendance_service import upload_attendance_logic # Add if you implement attendance upload
@@ -59,6 +85,34 @@ async def create_module(
     """Create a new module for a course."""
     return create_module_logic(teacher_id, course_id, module_name, module_description)
 
+@router.post("/modules/bulk-delete", response_model=Dict[str, Any])
+async def bulk_delete_modules(
+    request: BulkModuleDeleteRequest,
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Delete several modules with their materials and assignments in one transaction."""
+    deleted = bulk_delete_modules_logic(teacher_id, request.module_ids)
+    return {"message": "Modules deleted successfully", "deleted": deleted}
+
+@router.put("/modules/reorder", response_model=Dict[str, Any])
+async def reorder_modules(
+    request: ModuleReorderRequest,
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Set the display order of a course's modules."""
+    updated = reorder_modules_logic(teacher_id, request.course_id, request.module_ids)
+    return {"message": "Modules reordered successfully", "updated": updated}
+
+@router.post("/modules/{module_id}/move-items", response_model=Dict[str, Any])
+async def move_module_items(
+    module_id: int,
+    request: ModuleItemsMoveRequest,
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Move materials and assignments of the same course into this module."""
+    moved = move_module_items_logic(teacher_id, module_id, request.material_ids, request.assignment_ids)
+    return {"message": "Items moved successfully", "moved": moved}
+
 @router.get("/modules/{course_id}", response_model=List[Module])
 async def get_modules(
     course_id: int,
@@ -82,9 +136,9 @@ async def delete_module(
     module_id: int,
     teacher_id: str = Depends(verify_teacher) # Injected teacher_id
 ):
-    """Delete a module owned by the teacher."""
-    delete_module_logic(teacher_id, module_id)
-    return {"message": "Module deleted successfully"}
+    """Delete a module owned by the teacher, together with its materials and assignments."""
+    deleted = delete_module_logic(teacher_id, module_id)
+    return {"message": "Module deleted successfully", "deleted": deleted}
 
 # === Course Listing ===
 @router.get("/courses", response_model=List[dict])
@@ -94,6 +148,31 @@ async def get_teacher_courses(
     """Get all courses assigned to the teacher."""
     return get_teacher_courses_logic(teacher_id)
 
+# === Dashboard ===
+@router.get("/dashboard", response_model=Dict[str, Any])
+async def get_dashboard(
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Get the teacher's landing-page summary in a single call."""
+    return get_dashboard_logic(teacher_id)
+
+# === Calendar ===
+@router.get("/calendar", response_model=Dict[str, Any])
+async def get_calendar(
+    days: int = 14, # How many days ahead to include
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Get upcoming assignment deadlines and live classes across all the teacher's courses."""
+    return get_calendar_logic(teacher_id, days)
+
+@router.get("/calendar.ics")
+async def get_calendar_ical(
+    days: int = 60, # How many days ahead to include
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Same agenda as an iCalendar feed for calendar apps."""
+    return Response(content=get_calendar_ical_logic(teacher_id, days), media_type="text/calendar; charset=utf-8")
+
 # === Materials Management ===
 @router.post("/materials/upload", response_model=CourseMaterial)
 async def upload_lecture_notes(
@@ -106,6 +185,29 @@ async def upload_lecture_notes(
     """Upload course materials/lecture notes, optionally linking to a module."""
     return upload_lecture_notes_logic(teacher_id, course_id, material_title, file_link, module_id)
 
+@router.post("/materials/upload-file", response_model=CourseMaterial)
+async def upload_lecture_notes_file(
+    course_id: int = Form(...),
+    material_title: str = Form(...),
+    file: UploadFile = ...,
+    module_id: Optional[int] = Form(None),
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Upload the material file itself to storage and create the material record."""
+    return await upload_material_file_logic(teacher_id, course_id, material_title, file, module_id)
+
+@router.post("/materials/upload-complete", response_model=CourseMaterial)
+async def complete_lecture_notes_upload(
+    course_id: int = Form(...),
+    material_title: str = Form(...),
+    object_path: str = Form(...), # Path returned by /uploads/presign
+    module_id: Optional[int] = Form(None),
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Create the material record after a presigned upload has finished."""
+    file_link = resolve_uploaded_object(teacher_id, course_id, "materials", object_path, module_id)
+    return upload_lecture_notes_logic(teacher_id, course_id, material_title, file_link, module_id)
+
 @router.get("/materials/module/{module_id}", response_model=List[CourseMaterial])
 async def get_materials_by_module(
     module_id: int,
@@ -159,6 +261,48 @@ async def upload_assignment(
         teacher_id, course_id, assignment_title, description, due_date, file_link, module_id
     )
 
+@router.post("/assignments/upload-file", response_model=Assignment)
+async def upload_assignment_file(
+    course_id: int = Form(...),
+    assignment_title: str = Form(...),
+    file: UploadFile = ...,
+    description: Optional[str] = Form(None),
+    due_date: Optional[datetime] = Form(None),
+    module_id: Optional[int] = Form(None),
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Upload the assignment file itself to storage and create the assignment record."""
+    return await upload_assignment_file_logic(
+        teacher_id, course_id, assignment_title, file, description, due_date, module_id
+    )
+
+@router.post("/assignments/upload-complete", response_model=Assignment)
+async def complete_assignment_upload(
+    course_id: int = Form(...),
+    assignment_title: str = Form(...),
+    object_path: str = Form(...), # Path returned by /uploads/presign
+    description: Optional[str] = Form(None),
+    due_date: Optional[datetime] = Form(None),
+    module_id: Optional[int] = Form(None),
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Create the assignment record after a presigned upload has finished."""
+    file_link = resolve_uploaded_object(teacher_id, course_id, "assignments", object_path, module_id)
+    return upload_assignment_logic(
+        teacher_id, course_id, assignment_title, description, due_date, file_link, module_id
+    )
+
+# === Direct-to-storage Uploads ===
+@router.post("/uploads/presign", response_model=Dict[str, Any])
+async def create_upload_url(
+    course_id: int = Form(...),
+    kind: str = Form(...), # "materials" or "assignments"
+    filename: str = Form(...),
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Get a presigned URL to upload a file straight to storage, bypassing the API."""
+    return create_upload_url_logic(teacher_id, course_id, kind, filename)
+
 @router.get("/assignments/module/{module_id}", response_model=List[Assignment])
 async def get_assignments_by_module(
     module_id: int,
@@ -168,5 +312,91 @@ async def get_assignments_by_module(
     """Get all assignments for a specific module verified for the teacher and course."""
     return get_assignments_by_module_logic(teacher_id, course_id, module_id)
 
+# === Results Export ===
+@router.get("/results/export/{course_id}")
+async def export_results(
+    course_id: int,
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Export all results for a course as newline-delimited JSON."""
+    rows = export_results_logic(teacher_id, course_id)
+    return StreamingResponse(
+        (result.model_dump_json() + "\n" for result in rows.to_models(Result)),
+        media_type="application/x-ndjson",
+    )
+
+@router.get("/students/directory/stats", response_model=Dict[str, Any])
+async def get_student_directory_stats(
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Get hit rates and size of the cached student directory."""
+    return get_student_directory_stats_logic()
+
+# === Delta Sync ===
+@router.get("/sync/changes", response_model=Dict[str, Any])
+async def get_changes(
+    since: Optional[str] = None, # Sync token from a previous response; omit for a full snapshot
+    course_id: Optional[int] = None, # Restrict to a single course
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Get modules, materials and assignments changed since the given sync token, including deletions."""
+    return get_changes_logic(teacher_id, since, course_id)
+
+# === Realtime Events ===
+@router.get("/events/stream")
+async def stream_events(
+    course_id: Optional[int] = None, # Omit to subscribe to all of the teacher's courses
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Server-Sent Events stream of module, material, assignment and live class changes."""
+    sub = subscribe_course_events_logic(teacher_id, course_id)
+    return StreamingResponse(
+        event_stream(sub),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+# === Background Jobs ===
+@router.post("/jobs/results", response_model=Job, status_code=202)
+async def submit_bulk_results(
+    request: BulkResultsRequest,
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Queue grading of many students at once; poll /jobs/{job_id} for progress."""
+    return submit_bulk_results_logic(teacher_id, request)
+
+@router.post("/jobs/materials", response_model=Job, status_code=202)
+async def submit_bulk_materials(
+    request: BulkMaterialsRequest,
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Queue a mass import of course materials; poll /jobs/{job_id} for progress."""
+    return submit_bulk_materials_logic(teacher_id, request)
+
+@router.get("/jobs/{job_id}", response_model=Job)
+async def get_job(
+    job_id: str,
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Get status and progress of a background job."""
+    return get_job_logic(teacher_id, job_id)
+
+@router.get("/jobs/{job_id}/result", response_model=Dict[str, Any])
+async def get_job_result(
+    job_id: str,
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Get the result of a finished background job."""
+    return get_job_result_logic(teacher_id, job_id)
+
+# === Batch ===
+@router.post("/batch", response_model=Dict[str, Any])
+async def run_batch(
+    request: BatchRequest,
+    teacher_id: str = Depends(verify_teacher) # Injected teacher_id
+):
+    """Run several operations in one request; each gets its own status in the response."""
+    return await run_batch_logic(teacher_id, request)
+
 # === Add other teacher-specific routes here if needed ===
 # e.g., Uploading Results, Scheduling Live Classes, Reviewing Feedback, Uploading Attendance
\ No newline at end of file
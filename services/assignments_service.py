@@ -7,6 +7,9 @@ from fastapi import HTTPException, status
 from utils.database import get_supabase_client
 from utils.auth import verify_teacher_course_access
 from services.module_service import verify_module_owner
+from services.sync_service import record_change
+from services.calendar_service import add_assignment_to_calendars
+from services.prefetch_service import course_cache
 from typing import Dict, Any, Optional, List
 
 logger = logging.getLogger(__name__)
@@ -57,6 +60,8 @@ def upload_assignment_logic(
             logger.error("No data returned after insert: %s", resp)
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No assignment returned from database")
 
+        record_change(teacher_id, "assignments", data[0].get("assignment_id"), course_id)
+        add_assignment_to_calendars(data[0])
         return data[0]
 
     except HTTPException:
@@ -69,9 +74,12 @@ def upload_assignment_logic(
 def get_assignments_by_module_logic(teacher_id: str, course_id: int, module_id: int) -> List[Dict[str, Any]]:
     verify_teacher_course_access(teacher_id, course_id)
     # ensure module belongs to teacher and course
-    module = verify_module_owner(module_id, teacher_id)
+    snapshot = course_cache.get(course_id)
+    module = verify_module_owner(module_id, teacher_id, snapshot)
     if module["course_id"] != course_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Module does not belong to course")
+    if snapshot is not None:
+        return snapshot.by_module("assignments", module_id)
     supabase = get_supabase_client()
     resp = supabase.table("assignments").select("*").eq("module_id", module_id).execute()
     if getattr(resp, "error", None):
@@ -4,6 +4,7 @@ from fastapi import HTTPException
 from models.schema import Attendance
 from utils.database import get_supabase_client
 from utils.auth import verify_teacher_course_access
+from utils.audit import audit
 
 logger = logging.getLogger(__name__)
 
@@ -20,8 +21,7 @@ def upload_attendance_logic(teacher_id: str, course_id: int, class_date: date, a
     supabase = get_supabase_client()
 
     try:
-        logger.info(
-            f"Saving attendance: course_id={course_id}, class_date={class_date.isoformat()}, attendance_link={attendance_link}")
+        logger.debug("Saving attendance: course_id=%s, class_date=%s", course_id, class_date)
 
         db_response = supabase.table("attendance").insert({
             "course_id": course_id,
@@ -29,12 +29,13 @@ def upload_attendance_logic(teacher_id: str, course_id: int, class_date: date, a
             "attendance_link": attendance_link
         }).select("*").execute()
 
-        logger.info(f"Database response: {db_response}")
-
         if not db_response.data:
             raise HTTPException(status_code=500, detail="Failed to save attendance record to database.")
 
-        return Attendance(**db_response.data[0])
+        attendance = Attendance(**db_response.data[0])
+        audit.emit(teacher_id, "attendance.create", "attendance", attendance.attendance_id, course_id,
+                   {"class_date": class_date.isoformat()})
+        return attendance
 
     except HTTPException:
         raise
@@ -0,0 +1,188 @@
+# python
+# File: services/batch_service.py
+import asyncio
+import logging
+import os
+import re
+from datetime import datetime
+from typing import Dict, Any, Callable, List, Optional
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.encoders import jsonable_encoder
+from models.schema import BatchOperation, BatchRequest
+from services.module_service import (
+    create_module_logic,
+    get_modules_logic,
+    update_module_logic,
+    delete_module_logic,
+)
+from services.course_service import get_teacher_courses_logic
+from services.materials_service import (
+    get_materials_by_module_logic,
+    get_material_by_title_logic,
+    update_material_logic,
+    delete_material_logic,
+    upload_lecture_notes_logic,
+)
+from services.assignments_service import get_assignments_by_module_logic, upload_assignment_logic
+from services.dashboard_service import get_dashboard_logic
+from services.sync_service import get_changes_logic
+
+logger = logging.getLogger(__name__)
+
+BATCH_MAX_OPERATIONS = int(os.getenv("BATCH_MAX_OPERATIONS", "50"))
+BATCH_CONCURRENCY = int(os.getenv("BATCH_CONCURRENCY", "4"))
+
+# "$<op id>.<field>" inside args is replaced with that field of an earlier result.
+_REF_RE = re.compile(r"^\$([A-Za-z0-9_-]+)((?:\.[A-Za-z0-9_]+)*)$")
+
+
+def _datetime(value: Any) -> Optional[datetime]:
+    if value is None or isinstance(value, datetime):
+        return value
+    return datetime.fromisoformat(str(value))
+
+
+OPERATIONS: Dict[str, Callable[[str, Dict[str, Any]], Any]] = {
+    "courses.list": lambda t, a: get_teacher_courses_logic(t),
+    "dashboard.get": lambda t, a: get_dashboard_logic(t),
+    "sync.changes": lambda t, a: get_changes_logic(t, a.get("since"), a.get("course_id")),
+    "modules.create": lambda t, a: create_module_logic(t, a["course_id"], a["module_name"], a.get("module_description")),
+    "modules.list": lambda t, a: get_modules_logic(t, a["course_id"]),
+    "modules.update": lambda t, a: update_module_logic(t, a["module_id"], a.get("module_name"), a.get("module_description")),
+    "modules.delete": lambda t, a: delete_module_logic(t, a["module_id"]),
+    "materials.upload": lambda t, a: upload_lecture_notes_logic(
+        t, a["course_id"], a["material_title"], a["file_link"], a.get("module_id")),
+    "materials.list_by_module": lambda t, a: get_materials_by_module_logic(t, a["course_id"], a["module_id"]),
+    "materials.get_by_title": lambda t, a: get_material_by_title_logic(t, a["course_id"], a["material_title"]),
+    "materials.update": lambda t, a: update_material_logic(t, a["material_id"], a.get("material_title"), a.get("file_link")),
+    "materials.delete": lambda t, a: delete_material_logic(t, a["material_id"]),
+    "assignments.upload": lambda t, a: upload_assignment_logic(
+        t, a["course_id"], a["assignment_title"], a.get("description"), _datetime(a.get("due_date")),
+        a["file_link"], a.get("module_id")),
+    "assignments.list_by_module": lambda t, a: get_assignments_by_module_logic(t, a["course_id"], a["module_id"]),
+}
+
+
+def _references(value: Any) -> List[str]:
+    if isinstance(value, str):
+        match = _REF_RE.match(value)
+        return [match.group(1)] if match else []
+    if isinstance(value, dict):
+        return [ref for item in value.values() for ref in _references(item)]
+    if isinstance(value, list):
+        return [ref for item in value for ref in _references(item)]
+    return []
+
+
+def _resolve(value: Any, results: Dict[str, Any]) -> Any:
+    if isinstance(value, str):
+        match = _REF_RE.match(value)
+        if not match:
+            return value
+        resolved = results[match.group(1)]
+        for field in filter(None, match.group(2).split(".")):
+            if isinstance(resolved, list):
+                resolved = resolved[int(field)]
+            else:
+                resolved = resolved[field]
+        return resolved
+    if isinstance(value, dict):
+        return {key: _resolve(item, results) for key, item in value.items()}
+    if isinstance(value, list):
+        return [_resolve(item, results) for item in value]
+    return value
+
+
+def _validate(operations: List[BatchOperation]) -> Dict[str, List[str]]:
+    """Check ids, op names and dependencies; return each op's full dependency list."""
+    if not operations:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No operations given")
+    if len(operations) > BATCH_MAX_OPERATIONS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {BATCH_MAX_OPERATIONS} operations per batch")
+
+    ids = [operation.id for operation in operations]
+    if len(set(ids)) != len(ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Operation ids must be unique")
+
+    deps: Dict[str, List[str]] = {}
+    for operation in operations:
+        if operation.op not in OPERATIONS:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Unknown operation '{operation.op}'")
+        needed = list(dict.fromkeys(operation.depends_on + _references(operation.args)))
+        unknown = [dep for dep in needed if dep not in ids]
+        if unknown or operation.id in needed:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Operation '{operation.id}' has invalid dependencies")
+        deps[operation.id] = needed
+
+    # Reject cycles (depth-first search with colouring).
+    state: Dict[str, int] = {}
+
+    def visit(op_id: str) -> None:
+        if state.get(op_id) == 1:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Operation dependencies contain a cycle")
+        if state.get(op_id) == 2:
+            return
+        state[op_id] = 1
+        for dep in deps[op_id]:
+            visit(dep)
+        state[op_id] = 2
+
+    for op_id in deps:
+        visit(op_id)
+    return deps
+
+
+async def run_batch_logic(teacher_id: str, request: BatchRequest) -> Dict[str, Any]:
+    """
+    Run the operations of one batch for an already-authenticated teacher.
+    Independent operations run concurrently (at most BATCH_CONCURRENCY at a
+    time); an operation waits for everything it depends on, and fails with
+    424 if any of those failed.
+    """
+    operations = request.operations
+    deps = _validate(operations)
+    done: Dict[str, asyncio.Event] = {operation.id: asyncio.Event() for operation in operations}
+    results: Dict[str, Any] = {}
+    statuses: Dict[str, int] = {}
+    bodies: Dict[str, Any] = {}
+    semaphore = asyncio.Semaphore(BATCH_CONCURRENCY)
+
+    async def run(operation: BatchOperation) -> None:
+        try:
+            for dep in deps[operation.id]:
+                await done[dep].wait()
+            failed = [dep for dep in deps[operation.id] if statuses[dep] >= 400]
+            if failed:
+                statuses[operation.id] = status.HTTP_424_FAILED_DEPENDENCY
+                bodies[operation.id] = {"detail": f"Dependency failed: {', '.join(failed)}"}
+                return
+            async with semaphore:
+                try:
+                    args = _resolve(operation.args, results)
+                    result = await run_in_threadpool(OPERATIONS[operation.op], teacher_id, args)
+                    encoded = jsonable_encoder(result)
+                    results[operation.id] = encoded
+                    statuses[operation.id] = status.HTTP_200_OK
+                    bodies[operation.id] = encoded
+                except HTTPException as exc:
+                    statuses[operation.id] = exc.status_code
+                    bodies[operation.id] = {"detail": exc.detail}
+                except (KeyError, IndexError, TypeError, ValueError) as exc:
+                    statuses[operation.id] = status.HTTP_400_BAD_REQUEST
+                    bodies[operation.id] = {"detail": f"Invalid arguments: {exc}"}
+                except Exception as exc:
+                    logger.exception("Batch operation %s (%s) failed", operation.id, operation.op)
+                    statuses[operation.id] = status.HTTP_500_INTERNAL_SERVER_ERROR
+                    bodies[operation.id] = {"detail": str(exc)}
+        finally:
+            done[operation.id].set()
+
+    await asyncio.gather(*(run(operation) for operation in operations))
+
+    return {
+        "results": [
+            {"id": operation.id, "op": operation.op, "status": statuses[operation.id], "body": bodies[operation.id]}
+            for operation in operations
+        ]
+    }
@@ -0,0 +1,287 @@
+# python
+# File: services/calendar_service.py
+import logging
+import os
+import threading
+from datetime import datetime, timedelta, date
+from typing import Dict, Any, List, Optional, Set
+from fastapi import HTTPException, status
+from utils.database import get_supabase_client, fetch_all
+from utils.broker import broker
+from utils.cache import TTLCache
+from utils.timestamps import parse_timestamp
+from services.course_service import get_teacher_course_ids
+
+logger = logging.getLogger(__name__)
+
+# Each teacher's index covers [now, now + CALENDAR_HORIZON_DAYS) when built.
+CALENDAR_HORIZON_DAYS = int(os.getenv("CALENDAR_HORIZON_DAYS", "60"))
+CALENDAR_MAX_DAYS = int(os.getenv("CALENDAR_MAX_DAYS", "366"))
+# Full rebuild after this long, to pick up changes made outside this API.
+CALENDAR_REBUILD_SECONDS = float(os.getenv("CALENDAR_REBUILD_SECONDS", "900"))
+CALENDAR_MAX_TEACHERS = int(os.getenv("CALENDAR_MAX_TEACHERS", "5000"))
+ICAL_PRODID = "-//Teacher Management API//Calendar//EN"
+
+
+def assignment_event(row: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+    due = parse_timestamp(row.get("due_date"))
+    if due is None:
+        return None
+    return {
+        "type": "assignment_due",
+        "id": row["assignment_id"],
+        "course_id": row["course_id"],
+        "title": row.get("assignment_title"),
+        "start": due,
+        "end": due,
+    }
+
+
+def live_class_event(row: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "type": "live_class",
+        "id": row["class_id"],
+        "course_id": row["course_id"],
+        "title": row.get("title"),
+        "start": parse_timestamp(row.get("start_time")),
+        "end": parse_timestamp(row.get("end_time")),
+        "link": row.get("class_link"),
+    }
+
+
+class TeacherCalendar:
+    """
+    Events of one teacher bucketed by the UTC day they start, covering
+    [window_start, window_end). Events that span several days (long live
+    classes) are bucketed on every day they touch.
+    """
+
+    def __init__(self, course_ids: List[int], window_start: datetime, window_end: datetime):
+        self.course_ids: Set[int] = set(course_ids)
+        self.window_start = window_start
+        self.window_end = window_end
+        self.buckets: Dict[date, List[Dict[str, Any]]] = {}
+        # (type, id) -> days the event is bucketed on, so updates don't scan every bucket.
+        self._days: Dict[tuple, List[date]] = {}
+        # While building, incremental removals are remembered so rows the
+        # range queries read before the delete are not added back.
+        self.building = True
+        self._removed: Set[tuple] = set()
+        self.lock = threading.Lock()
+
+    def add(self, event: Dict[str, Any], from_build: bool = False) -> None:
+        start, end = event["start"], event["end"] or event["start"]
+        if start is None or end < self.window_start or start >= self.window_end:
+            return
+        with self.lock:
+            key = (event["type"], event["id"])
+            if from_build and (key in self._removed or key in self._days):
+                # Deleted, or already added incrementally, during the build.
+                return
+            self._remove(event["type"], event["id"])
+            days = []
+            day = max(start, self.window_start).date()
+            while day <= min(end, self.window_end).date():
+                bucket = self.buckets.setdefault(day, [])
+                bucket.append(event)
+                bucket.sort(key=lambda item: item["start"])
+                days.append(day)
+                day += timedelta(days=1)
+            self._days[(event["type"], event["id"])] = days
+
+    def _remove(self, event_type: str, event_id: Any) -> None:
+        # Caller holds self.lock.
+        for day in self._days.pop((event_type, event_id), ()):
+            kept = [e for e in self.buckets[day] if not (e["type"] == event_type and e["id"] == event_id)]
+            if kept:
+                self.buckets[day] = kept
+            else:
+                del self.buckets[day]
+
+    def remove(self, event_type: str, event_id: Any) -> None:
+        with self.lock:
+            if self.building:
+                self._removed.add((event_type, event_id))
+            self._remove(event_type, event_id)
+
+    def finish_build(self) -> None:
+        with self.lock:
+            self.building = False
+            self._removed.clear()
+
+    def covers(self, start: datetime, end: datetime) -> bool:
+        return self.window_start <= start and end <= self.window_end
+
+    def range(self, start: datetime, end: datetime) -> List[Dict[str, Any]]:
+        seen = set()
+        events = []
+        with self.lock:
+            day = start.date()
+            while day <= end.date():
+                for event in self.buckets.get(day, ()):
+                    key = (event["type"], event["id"])
+                    event_end = event["end"] or event["start"]
+                    if key not in seen and event_end >= start and event["start"] < end:
+                        seen.add(key)
+                        events.append(event)
+                day += timedelta(days=1)
+        events.sort(key=lambda item: item["start"])
+        return events
+
+
+# Built indexes, dropped after CALENDAR_REBUILD_SECONDS so edits made outside
+# the API are picked up, and bounded to CALENDAR_MAX_TEACHERS.
+_indexes: TTLCache[TeacherCalendar] = TTLCache(ttl=CALENDAR_REBUILD_SECONDS, max_entries=CALENDAR_MAX_TEACHERS)
+# Indexes being built, so incremental updates reach them before they are published.
+_building: Dict[int, TeacherCalendar] = {}
+_building_lock = threading.Lock()
+
+
+_PRIMARY_KEYS = {"assignments": "assignment_id", "live_classes": "class_id"}
+
+
+def _query(table: str, course_ids: List[int], build) -> List[Dict[str, Any]]:
+    supabase = get_supabase_client()
+    return fetch_all(
+        lambda: build(supabase.table(table).select("*").in_("course_id", course_ids)),
+        _PRIMARY_KEYS[table],
+        f"DB error fetching {table}",
+    )
+
+
+def build_teacher_calendar(teacher_id: str, start: datetime, end: datetime) -> TeacherCalendar:
+    """
+    Build a teacher's index with two range queries over all their courses.
+    The index receives incremental updates from before the range queries
+    run, so writes racing the build are not lost.
+    """
+    course_ids = get_teacher_course_ids(teacher_id)
+    calendar = TeacherCalendar(course_ids, start, end)
+    with _building_lock:
+        _building[id(calendar)] = calendar
+    try:
+        if course_ids:
+            lo, hi = start.isoformat(), end.isoformat()
+            for row in _query("assignments", course_ids, lambda q: q.gte("due_date", lo).lt("due_date", hi)):
+                event = assignment_event(row)
+                if event is not None:
+                    calendar.add(event, from_build=True)
+            for row in _query("live_classes", course_ids, lambda q: q.lt("start_time", hi).gte("end_time", lo)):
+                calendar.add(live_class_event(row), from_build=True)
+        calendar.finish_build()
+        return calendar
+    finally:
+        with _building_lock:
+            _building.pop(id(calendar), None)
+
+
+def get_calendar_logic(teacher_id: str, days: int = 14) -> Dict[str, Any]:
+    """
+    Upcoming assignment deadlines and live classes across all the teacher's
+    courses for the next `days` days. Served from the in-memory index when it
+    is warm and covers the range.
+    """
+    if days < 1 or days > CALENDAR_MAX_DAYS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"days must be between 1 and {CALENDAR_MAX_DAYS}")
+    start = datetime.utcnow()
+    end = start + timedelta(days=days)
+
+    try:
+        calendar = _indexes.get(teacher_id)
+        if calendar is None or not calendar.covers(start, end):
+            # Headroom of one rebuild period keeps later requests for the same
+            # number of days inside the window until the index is rebuilt anyway.
+            window_end = start + timedelta(days=max(days, CALENDAR_HORIZON_DAYS), seconds=CALENDAR_REBUILD_SECONDS)
+            _indexes.invalidate(teacher_id)
+            calendar = _indexes.get_or_load(teacher_id, lambda: build_teacher_calendar(teacher_id, start, window_end))
+    except HTTPException:
+        raise
+    except Exception as exc:
+        logger.exception("Unexpected error building calendar")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+
+    return {"from": start, "to": end, "events": calendar.range(start, end)}
+
+
+def _indexes_for_course(course_id: int) -> List[TeacherCalendar]:
+    with _building_lock:
+        building = list(_building.values())
+    return [calendar for calendar in _indexes.values() + building if course_id in calendar.course_ids]
+
+
+def add_assignment_to_calendars(row: Dict[str, Any]) -> None:
+    """Incremental update from upload_assignment_logic."""
+    event = assignment_event(row)
+    if event is None:
+        return
+    for calendar in _indexes_for_course(row["course_id"]):
+        calendar.add(event)
+
+
+def add_live_class_to_calendars(row: Dict[str, Any]) -> None:
+    """Incremental update from schedule_live_class_logic."""
+    event = live_class_event(row)
+    for calendar in _indexes_for_course(row["course_id"]):
+        calendar.add(event)
+
+
+def _on_change(course_id: int, event: Dict[str, Any]) -> None:
+    # Deleted assignments (single or cascaded from module deletes) leave the index.
+    if event.get("table") == "assignments" and event.get("op") == "delete":
+        for calendar in _indexes_for_course(course_id):
+            calendar.remove("assignment_due", event["row_id"])
+
+
+broker.add_listener(_on_change)
+
+
+def _ical_escape(text: Any) -> str:
+    return (str(text or "").replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def _ical_time(value: datetime) -> str:
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def _ical_fold(line: str) -> str:
+    # RFC 5545: lines longer than 75 octets continue on lines starting with a space.
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line
+    parts, current = [], b""
+    for char in line:
+        char_bytes = char.encode("utf-8")
+        if len(current) + len(char_bytes) > (75 if not parts else 74):
+            parts.append(current.decode("utf-8"))
+            current = b""
+        current += char_bytes
+    parts.append(current.decode("utf-8"))
+    return "\r\n ".join(parts)
+
+
+def render_ical(events: List[Dict[str, Any]]) -> str:
+    stamp = _ical_time(datetime.utcnow())
+    lines = ["BEGIN:VCALENDAR", "VERSION:2.0", f"PRODID:{ICAL_PRODID}", "CALSCALE:GREGORIAN"]
+    for event in events:
+        lines += [
+            "BEGIN:VEVENT",
+            f"UID:{event['type']}-{event['id']}@teacher-management-api",
+            f"DTSTAMP:{stamp}",
+            f"DTSTART:{_ical_time(event['start'])}",
+            f"DTEND:{_ical_time(event['end'] or event['start'])}",
+        ]
+        if event["type"] == "assignment_due":
+            lines.append(f"SUMMARY:{_ical_escape('Due: ' + str(event['title']))}")
+        else:
+            lines.append(f"SUMMARY:{_ical_escape(event['title'])}")
+            if event.get("link"):
+                lines.append(f"URL:{event['link']}")
+        lines.append(f"DESCRIPTION:{_ical_escape('Course ' + str(event['course_id']))}")
+        lines.append("END:VEVENT")
+    lines.append("END:VCALENDAR")
+    return "\r\n".join(_ical_fold(line) for line in lines) + "\r\n"
+
+
+def get_calendar_ical_logic(teacher_id: str, days: int = 60) -> str:
+    return render_ical(get_calendar_logic(teacher_id, days)["events"])
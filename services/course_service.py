@@ -27,3 +27,16 @@ def get_teacher_courses_logic(teacher_id: str) -> List[Dict[str, Any]]:
     except Exception as exc:
         logger.exception("Unexpected error fetching teacher courses")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+
+
+def get_teacher_course_ids(teacher_id: str) -> List[int]:
+    """
+    Return only the ids of the teacher's courses, for scoping other queries.
+    """
+    verify_teacher_exists(teacher_id)
+    supabase = get_supabase_client()
+    resp = supabase.table("course").select("course_id").eq("teacher_ids", teacher_id).execute()
+    if getattr(resp, "error", None):
+        logger.error("DB error fetching course ids for teacher %s: %s", teacher_id, resp.error)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="DB error fetching courses")
+    return [row["course_id"] for row in (resp.data or [])]
@@ -0,0 +1,137 @@
+# python
+# File: services/dashboard_service.py
+import contextvars
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Dict, Any, List, Set
+from fastapi import HTTPException, status
+from utils.database import get_supabase_client
+from utils.broker import broker
+from utils.cache import TTLCache
+from services.course_service import get_teacher_courses_logic
+
+logger = logging.getLogger(__name__)
+
+DASHBOARD_TTL_SECONDS = float(os.getenv("DASHBOARD_TTL_SECONDS", "30"))
+DASHBOARD_ITEM_LIMIT = int(os.getenv("DASHBOARD_ITEM_LIMIT", "20"))
+
+_course_teachers: Dict[int, Set[str]] = {}
+_teacher_courses: Dict[str, List[int]] = {}
+
+
+def _forget_teacher(teacher_id: str) -> None:
+    # Keep the course -> teachers index limited to teachers with a cached dashboard.
+    with _index_lock:
+        for course_id in _teacher_courses.pop(teacher_id, ()):
+            teachers = _course_teachers.get(course_id)
+            if teachers is not None:
+                teachers.discard(teacher_id)
+                if not teachers:
+                    del _course_teachers[course_id]
+
+
+_cache: TTLCache[Dict[str, Any]] = TTLCache(ttl=DASHBOARD_TTL_SECONDS, max_entries=5000, on_evict=_forget_teacher)
+_index_lock = threading.Lock()
+_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="dashboard")
+
+
+def _select(table: str, columns: str, course_ids: List[int], build=None) -> List[Dict[str, Any]]:
+    supabase = get_supabase_client()
+    query = supabase.table(table).select(columns).in_("course_id", course_ids)
+    if build is not None:
+        query = build(query)
+    resp = query.execute()
+    if getattr(resp, "error", None):
+        logger.error("DB error fetching %s for dashboard: %s", table, resp.error)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"DB error fetching {table}")
+    return resp.data or []
+
+
+def _count_modules(teacher_id: str, course_id: int) -> int:
+    # A HEAD count instead of selecting rows, which max-rows would truncate.
+    supabase = get_supabase_client()
+    resp = supabase.table("modules") \
+        .select("module_id", count="exact", head=True) \
+        .eq("course_id", course_id) \
+        .eq("teacher_id", teacher_id) \
+        .execute()
+    if getattr(resp, "error", None):
+        logger.error("DB error counting modules for dashboard: %s", resp.error)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="DB error counting modules")
+    return resp.count or 0
+
+
+def _build_dashboard(teacher_id: str) -> Dict[str, Any]:
+    courses = get_teacher_courses_logic(teacher_id)
+    course_ids = [course["course_id"] for course in courses]
+    now = datetime.utcnow().isoformat()
+    limit = DASHBOARD_ITEM_LIMIT
+
+    # Register before querying, so a write during the build invalidates the
+    # in-flight load instead of being cached for the full TTL.
+    with _index_lock:
+        _teacher_courses[teacher_id] = list(course_ids)
+        for course_id in course_ids:
+            _course_teachers.setdefault(course_id, set()).add(teacher_id)
+
+    sections: Dict[str, List[Dict[str, Any]]] = {
+        "upcoming_live_classes": [], "recent_feedback": [], "pending_assignments": [],
+    }
+    module_counts: Dict[int, int] = {}
+    if course_ids:
+        queries = {
+            "upcoming_live_classes": lambda: _select(
+                "live_classes", "*", course_ids,
+                lambda q: q.gte("end_time", now).order("start_time").limit(limit)),
+            "recent_feedback": lambda: _select(
+                "feedback", "*", course_ids,
+                lambda q: q.order("created_at", desc=True).limit(limit)),
+            "pending_assignments": lambda: _select(
+                "assignments", "assignment_id, course_id, assignment_title, due_date", course_ids,
+                lambda q: q.gte("due_date", now).order("due_date").limit(limit)),
+        }
+        # One set-based query per section plus a count per course, run concurrently.
+        futures = {
+            name: _executor.submit(contextvars.copy_context().run, query)
+            for name, query in queries.items()
+        }
+        count_futures = {
+            course_id: _executor.submit(contextvars.copy_context().run, _count_modules, teacher_id, course_id)
+            for course_id in course_ids
+        }
+        sections = {name: future.result() for name, future in futures.items()}
+        module_counts = {course_id: future.result() for course_id, future in count_futures.items()}
+
+    return {
+        "courses": [{**course, "module_count": module_counts.get(course["course_id"], 0)} for course in courses],
+        **sections,
+        "generated_at": datetime.utcnow().isoformat(),
+    }
+
+
+def get_dashboard_logic(teacher_id: str) -> Dict[str, Any]:
+    """
+    Return the teacher's courses with module counts, upcoming live classes,
+    recent feedback and pending assignments. Cached per teacher for
+    DASHBOARD_TTL_SECONDS and invalidated when any of their courses change.
+    """
+    try:
+        return _cache.get_or_load(teacher_id, lambda: _build_dashboard(teacher_id))
+    except HTTPException:
+        raise
+    except Exception as exc:
+        logger.exception("Unexpected error building dashboard")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
+
+
+def invalidate_course_dashboards(course_id: int, event: Dict[str, Any] = None) -> None:
+    with _index_lock:
+        teacher_ids = list(_course_teachers.get(course_id, ()))
+    for teacher_id in teacher_ids:
+        _cache.invalidate(teacher_id)
+
+
+broker.add_listener(invalidate_course_dashboards)
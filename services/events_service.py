@@ -0,0 +1,54 @@
+# python
+# File: services/events_service.py
+import asyncio
+import json
+import logging
+from typing import AsyncIterator, Optional
+from fastapi import HTTPException, status
+from utils.auth import verify_teacher_course_access
+from utils.broker import broker, Subscription
+from services.course_service import get_teacher_course_ids
+
+logger = logging.getLogger(__name__)
+
+HEARTBEAT_SECONDS = 15.0
+
+
+def subscribe_course_events_logic(teacher_id: str, course_id: Optional[int] = None) -> Subscription:
+    """
+    Subscribe the teacher to change events for one course, or all their courses.
+    """
+    if course_id is not None:
+        verify_teacher_course_access(teacher_id, course_id)
+        course_ids = [course_id]
+    else:
+        course_ids = get_teacher_course_ids(teacher_id)
+        if not course_ids:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Teacher has no courses to subscribe to")
+
+    sub = broker.subscribe(course_ids)
+    if sub is None:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Too many event subscribers")
+    return sub
+
+
+async def event_stream(sub: Subscription) -> AsyncIterator[str]:
+    """
+    Yield Server-Sent Events for a subscription until the client disconnects.
+    Idle connections only receive a comment line every HEARTBEAT_SECONDS.
+    """
+    try:
+        yield "retry: 5000\n\n"
+        while True:
+            try:
+                event = await asyncio.wait_for(sub.queue.get(), timeout=HEARTBEAT_SECONDS)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if sub.dropped:
+                # Tell the client it missed events so it can fall back to /sync/changes.
+                yield f"event: overflow\ndata: {json.dumps({'dropped': sub.dropped})}\n\n"
+                sub.dropped = 0
+            yield f"event: change\ndata: {json.dumps(event, default=str)}\n\n"
+    finally:
+        broker.unsubscribe(sub)
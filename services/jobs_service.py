@@ -0,0 +1,138 @@
+# python
+# File: services/jobs_service.py
+import logging
+from typing import Dict, Any, List
+from fastapi import HTTPException, status
+from models.schema import Job, JobStatus, BulkResultsRequest, BulkMaterialsRequest
+from utils.database import get_supabase_client
+from utils.auth import verify_teacher_course_access
+from utils.jobs import job_queue, JOB_CHUNK_SIZE, ProgressCallback
+from utils.audit import audit
+from services.module_service import verify_module_owner
+from services.sync_service import record_changes
+from services.student_directory import student_directory
+
+logger = logging.getLogger(__name__)
+
+
+def _chunks(items: List[Any], size: int = JOB_CHUNK_SIZE):
+    for start in range(0, len(items), size):
+        yield start, items[start:start + size]
+
+
+def _insert_chunk(table: str, rows: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    supabase = get_supabase_client()
+    resp = supabase.table(table).insert(rows).execute()
+    if getattr(resp, "error", None):
+        logger.error("Bulk insert into %s failed: %s", table, resp.error)
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"Failed to insert into {table}")
+    return resp.data or []
+
+
+def _run_bulk_results(teacher_id: str, payload: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    """
+    Grade a cohort: resolve assignments once for the course, resolve students
+    per chunk through the student directory, and insert each chunk with a
+    single statement.
+    """
+    course_id = payload["course_id"]
+    items = payload["results"]
+    supabase = get_supabase_client()
+
+    assignments_resp = supabase.table("assignments") \
+        .select("assignment_id, assignment_title") \
+        .eq("course_id", course_id) \
+        .execute()
+    if getattr(assignments_resp, "error", None):
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="DB error fetching assignments")
+    assignment_ids: Dict[str, int] = {}
+    for row in assignments_resp.data or []:
+        assignment_ids.setdefault(row["assignment_title"], row["assignment_id"])
+
+    inserted = 0
+    skipped: List[Dict[str, Any]] = []
+    for start, chunk in _chunks(items):
+        student_names = student_directory.resolve_many(item["student_id"] for item in chunk)
+
+        rows = []
+        for offset, item in enumerate(chunk):
+            assignment_id = assignment_ids.get(item["assignment_title"])
+            student_name = student_names.get(item["student_id"])
+            if assignment_id is None:
+                skipped.append({"index": start + offset, "reason": f"Assignment '{item['assignment_title']}' not found"})
+            elif student_name is None:
+                skipped.append({"index": start + offset, "reason": f"Student with ID {item['student_id']} not found"})
+            else:
+                rows.append({
+                    "course_id": course_id,
+                    "assignment_id": assignment_id,
+                    "assignment_title": item["assignment_title"],
+                    "student_id": item["student_id"],
+                    "student_name": student_name,
+                    "result": item["result"],
+                })
+        if rows:
+            created = _insert_chunk("results", rows)
+            for row in created:
+                audit.emit(teacher_id, "results.create", "results", row.get("result_id"), course_id,
+                           {"student_id": row.get("student_id"), "assignment_id": row.get("assignment_id"),
+                            "result": row.get("result"), "job": "bulk_results"})
+            inserted += len(created)
+        progress(start + len(chunk), len(items))
+
+    return {"inserted": inserted, "skipped": skipped}
+
+
+def _run_bulk_materials(teacher_id: str, payload: Dict[str, Any], progress: ProgressCallback) -> Dict[str, Any]:
+    course_id = payload["course_id"]
+    module_id = payload.get("module_id")
+    items = payload["materials"]
+
+    material_ids: List[int] = []
+    for start, chunk in _chunks(items):
+        rows = []
+        for item in chunk:
+            row = {"course_id": course_id, "material_title": item["material_title"], "file_path": item["file_link"]}
+            if module_id is not None:
+                row["module_id"] = module_id
+            rows.append(row)
+        created = _insert_chunk("course_materials", rows)
+        ids = [row.get("material_id") for row in created]
+        record_changes(teacher_id, "course_materials", ids, course_id)
+        material_ids.extend(ids)
+        progress(start + len(chunk), len(items))
+
+    return {"inserted": len(material_ids), "material_ids": material_ids}
+
+
+def submit_bulk_results_logic(teacher_id: str, request: BulkResultsRequest) -> Job:
+    """
+    Validate access up front, then queue the grading job. Per-row problems
+    (unknown student or assignment) are reported in the job result.
+    """
+    verify_teacher_course_access(teacher_id, request.course_id)
+    payload = request.model_dump(mode="json")
+    return job_queue.submit("bulk_results", teacher_id, _run_bulk_results, payload, total=len(request.results))
+
+
+def submit_bulk_materials_logic(teacher_id: str, request: BulkMaterialsRequest) -> Job:
+    verify_teacher_course_access(teacher_id, request.course_id)
+    if request.module_id is not None:
+        module = verify_module_owner(request.module_id, teacher_id)
+        if module["course_id"] != request.course_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Module does not belong to specified course")
+    payload = request.model_dump(mode="json")
+    return job_queue.submit("bulk_materials", teacher_id, _run_bulk_materials, payload, total=len(request.materials))
+
+
+def get_job_logic(teacher_id: str, job_id: str) -> Job:
+    return job_queue.get(job_id, teacher_id)
+
+
+def get_job_result_logic(teacher_id: str, job_id: str) -> Dict[str, Any]:
+    job = job_queue.get(job_id, teacher_id)
+    if job.status in (JobStatus.QUEUED, JobStatus.RUNNING):
+        raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail=f"Job is still {job.status.value}")
+    if job.status == JobStatus.FAILED:
+        raise HTTPException(status_code=status.HTTP_422_UNPROCESSABLE_ENTITY, detail=job.error)
+    return job.result or {}
@@ -3,6 +3,9 @@ from fastapi import HTTPException, status
 from models.schema import LiveClass, LiveClassCreate
 from utils.database import get_supabase_client
 from utils.auth import verify_teacher_course_access
+from utils.broker import broker
+from utils.audit import audit
+from services.calendar_service import add_live_class_to_calendars
 
 logger = logging.getLogger(__name__)
 
@@ -44,7 +47,16 @@ def schedule_live_class_logic(teacher_id: str, live_class: LiveClassCreate) -> L
                 detail="No live class returned from database"
             )
 
-        return LiveClass(**response.data[0])
+        scheduled = LiveClass(**response.data[0])
+        audit.emit(teacher_id, "live_classes.create", "live_classes", scheduled.class_id, scheduled.course_id)
+        add_live_class_to_calendars(response.data[0])
+        broker.publish(scheduled.course_id, {
+            "table": "live_classes",
+            "row_id": scheduled.class_id,
+            "course_id": scheduled.course_id,
+            "op": "upsert",
+        })
+        return scheduled
 
     except HTTPException:
         raise
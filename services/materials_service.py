@@ -6,6 +6,8 @@ from typing import List, Optional, Dict, Any
 from models.schema import CourseMaterial
 from utils.database import get_supabase_client
 from services.module_service import verify_module_owner
+from services.sync_service import record_change
+from services.prefetch_service import course_cache
 from utils.auth import verify_teacher_course_access
 
 logger = logging.getLogger(__name__)
@@ -42,7 +44,9 @@ def upload_lecture_notes_logic(teacher_id: str, course_id: int, material_title:
         if not response.data:
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="No course material returned from database")
 
-        return CourseMaterial(**response.data[0])
+        material = CourseMaterial(**response.data[0])
+        record_change(teacher_id, "course_materials", material.material_id, course_id)
+        return material
     except HTTPException:
         raise
     except Exception as exc:
@@ -52,9 +56,12 @@ def upload_lecture_notes_logic(teacher_id: str, course_id: int, material_title:
 
 def get_materials_by_module_logic(teacher_id: str, course_id: int, module_id: int) -> List[CourseMaterial]:
     verify_teacher_course_access(teacher_id, course_id)
-    module = verify_module_owner(module_id, teacher_id)
+    snapshot = course_cache.get(course_id)
+    module = verify_module_owner(module_id, teacher_id, snapshot)
     if module["course_id"] != course_id:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Module does not belong to specified course")
+    if snapshot is not None:
+        return [CourseMaterial(**item) for item in snapshot.by_module("course_materials", module_id)]
     supabase = get_supabase_client()
 
     try:
@@ -106,7 +113,9 @@ def update_material_logic(teacher_id: str, material_id: int, material_title: Opt
         upd = supabase.table("course_materials").update(updates).eq("material_id", material_id).select("*").execute()
         if getattr(upd, "error", None):
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update material")
-        return CourseMaterial(**upd.data[0])
+        material = CourseMaterial(**upd.data[0])
+        record_change(teacher_id, "course_materials", material_id, course_id)
+        return material
     except HTTPException:
         raise
     except Exception as exc:
@@ -132,6 +141,7 @@ def delete_material_logic(teacher_id: str, material_id: int) -> None:
         d = supabase.table("course_materials").delete().eq("material_id", material_id).execute()
         if getattr(d, "error", None):
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete material")
+        record_change(teacher_id, "course_materials", material_id, course_id, op="delete")
     except HTTPException:
         raise
     except Exception as exc:
@@ -6,6 +6,8 @@ from fastapi import HTTPException, status
 from utils.database import get_supabase_client
 from utils.auth import verify_teacher_course_access
 from models.schema import Module
+from services.sync_service import record_change, record_changes
+from services.prefetch_service import course_cache, CourseSnapshot
 
 logger = logging.getLogger(__name__)
 
@@ -25,17 +27,22 @@ def create_module_logic(teacher_id: str, course_id: int, module_name: str, modul
         resp = supabase.table("modules").insert(data).select("*").execute()
         if getattr(resp, "error", None):
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create module")
-        return Module(**resp.data[0])
+        module = Module(**resp.data[0])
+        record_change(teacher_id, "modules", module.module_id, course_id)
+        return module
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
 def get_modules_logic(teacher_id: str, course_id: int) -> List[Module]:
     verify_teacher_course_access(teacher_id, course_id)
+    snapshot = course_cache.get(course_id)
+    if snapshot is not None:
+        return [Module(**item) for item in snapshot.modules(teacher_id)]
     supabase = get_supabase_client()
 
     try:
-        resp = supabase.table("modules").select("*").eq("course_id", course_id).eq("teacher_id", teacher_id).execute()
+        resp = supabase.table("modules").select("*").eq("course_id", course_id).eq("teacher_id", teacher_id).order("position").execute()
         if getattr(resp, "error", None):
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to fetch modules")
         return [Module(**item) for item in resp.data or []]
@@ -51,11 +58,12 @@ def get_module_by_id(module_id: int) -> Optional[Dict[str, Any]]:
     return (resp.data or [None])[0]
 
 
-def verify_module_owner(module_id: int, teacher_id: str) -> Dict[str, Any]:
+def verify_module_owner(module_id: int, teacher_id: str, snapshot: Optional[CourseSnapshot] = None) -> Dict[str, Any]:
     """
     Ensure the module exists and belongs to the teacher. Returns module row.
+    Uses the prefetched course snapshot, when given, instead of a query.
     """
-    module = get_module_by_id(module_id)
+    module = (snapshot.module(module_id) if snapshot is not None else None) or get_module_by_id(module_id)
     if not module:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Module not found")
     if module.get("teacher_id") != teacher_id:
@@ -77,20 +85,113 @@ def update_module_logic(teacher_id: str, module_id: int, module_name: str = None
         resp = supabase.table("modules").update(updates).eq("module_id", module_id).select("*").execute()
         if getattr(resp, "error", None):
             raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to update module")
-        return Module(**resp.data[0])
+        updated = Module(**resp.data[0])
+        record_change(teacher_id, "modules", module_id, course_id)
+        return updated
     except Exception as e:
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
 
 
-def delete_module_logic(teacher_id: str, module_id: int) -> None:
-    supabase = get_supabase_client()
+def delete_module_logic(teacher_id: str, module_id: int) -> Dict[str, int]:
+    """
+    Delete a module together with its materials and assignments.
+    """
     module = verify_module_owner(module_id, teacher_id)
     course_id = module["course_id"]
     verify_teacher_course_access(teacher_id, course_id)
+    return _run_module_rpc(teacher_id, "bulk_delete_modules", {
+        "p_teacher_id": teacher_id,
+        "p_module_ids": [module_id],
+    }, op="delete")
+
 
+def _run_module_rpc(teacher_id: str, function: str, params: Dict[str, Any], op: str) -> Dict[str, int]:
+    """
+    Call one of the transactional module RPCs (migrations/006_bulk_module_ops.sql),
+    record sync/audit changes for the rows it reports and return per-table counts.
+    """
+    supabase = get_supabase_client()
     try:
-        resp = supabase.table("modules").delete().eq("module_id", module_id).execute()
-        if getattr(resp, "error", None):
-            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to delete module")
+        resp = supabase.rpc(function, params).execute()
     except Exception as e:
+        if getattr(e, "code", None) == "42501":
+            raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=getattr(e, "message", None) or str(e))
+        logger.exception("Module RPC %s failed", function)
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(e))
+    if getattr(resp, "error", None):
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"{function} failed")
+
+    affected = resp.data or {}
+    counts: Dict[str, int] = {}
+    for table, rows in affected.items():
+        counts[table] = len(rows)
+        by_course: Dict[Any, List[int]] = {}
+        for row in rows:
+            by_course.setdefault(row["course_id"], []).append(row["id"])
+        for course_id, row_ids in by_course.items():
+            record_changes(teacher_id, table, row_ids, course_id, op=op)
+    return counts
+
+
+def _verify_modules_owner(module_ids: List[int], teacher_id: str) -> List[Dict[str, Any]]:
+    """
+    Set-based verify_module_owner: one query for all ids.
+    """
+    if not module_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No module ids given")
+    supabase = get_supabase_client()
+    resp = supabase.table("modules").select("module_id, course_id, teacher_id").in_("module_id", module_ids).execute()
+    if getattr(resp, "error", None):
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="DB error fetching modules")
+    modules = resp.data or []
+    found = {module["module_id"] for module in modules}
+    missing = [module_id for module_id in module_ids if module_id not in found]
+    if missing:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=f"Modules not found: {missing}")
+    if any(module.get("teacher_id") != teacher_id for module in modules):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Access denied to module")
+    return modules
+
+
+def bulk_delete_modules_logic(teacher_id: str, module_ids: List[int]) -> Dict[str, int]:
+    """
+    Delete many modules with their materials and assignments in one transaction.
+    """
+    module_ids = list(dict.fromkeys(module_ids))
+    modules = _verify_modules_owner(module_ids, teacher_id)
+    for course_id in {module["course_id"] for module in modules}:
+        verify_teacher_course_access(teacher_id, course_id)
+    return _run_module_rpc(teacher_id, "bulk_delete_modules", {
+        "p_teacher_id": teacher_id,
+        "p_module_ids": module_ids,
+    }, op="delete")
+
+
+def move_module_items_logic(teacher_id: str, module_id: int, material_ids: List[int], assignment_ids: List[int]) -> Dict[str, int]:
+    """
+    Move materials and assignments of the same course into the given module.
+    """
+    module = verify_module_owner(module_id, teacher_id)
+    verify_teacher_course_access(teacher_id, module["course_id"])
+    if not material_ids and not assignment_ids:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Nothing to move")
+    return _run_module_rpc(teacher_id, "move_module_items", {
+        "p_teacher_id": teacher_id,
+        "p_target_module_id": module_id,
+        "p_material_ids": material_ids,
+        "p_assignment_ids": assignment_ids,
+    }, op="upsert")
+
+
+def reorder_modules_logic(teacher_id: str, course_id: int, module_ids: List[int]) -> Dict[str, int]:
+    """
+    Set module positions within a course from the given order.
+    """
+    verify_teacher_course_access(teacher_id, course_id)
+    if len(set(module_ids)) != len(module_ids):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Duplicate module ids")
+    return _run_module_rpc(teacher_id, "reorder_modules", {
+        "p_teacher_id": teacher_id,
+        "p_course_id": course_id,
+        "p_module_ids": module_ids,
+    }, op="upsert")
@@ -0,0 +1,293 @@
+# python
+# File: services/prefetch_service.py
+import asyncio
+import logging
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from utils.database import get_primary_client, fetch_all
+from utils.broker import broker
+from utils.timestamps import parse_timestamp
+
+logger = logging.getLogger(__name__)
+
+PREFETCH_ENABLED = os.getenv("PREFETCH_ENABLED", "1") == "1"
+# How far ahead of a live class its course data is loaded.
+PREFETCH_LEAD_MINUTES = float(os.getenv("PREFETCH_LEAD_MINUTES", "15"))
+PREFETCH_INTERVAL_SECONDS = float(os.getenv("PREFETCH_INTERVAL_SECONDS", "60"))
+PREFETCH_MEMORY_MB = float(os.getenv("PREFETCH_MEMORY_MB", "64"))
+# Snapshots are only invalidated by writes in this process; with several
+# workers, this bounds how long another worker's write can go unseen.
+PREFETCH_MAX_AGE_SECONDS = float(os.getenv("PREFETCH_MAX_AGE_SECONDS", str(PREFETCH_INTERVAL_SECONDS)))
+
+# Prefetched tables, mapped to the primary key their loads are paged by.
+PREFETCH_TABLES: Dict[str, str] = {
+    "modules": "module_id",
+    "course_materials": "material_id",
+    "assignments": "assignment_id",
+}
+
+
+def _deep_size(obj: Any, seen: set) -> int:
+    """Bytes held by parsed rows: containers plus every distinct object they reference."""
+    if id(obj) in seen:
+        return 0
+    seen.add(id(obj))
+    size = sys.getsizeof(obj)
+    if isinstance(obj, dict):
+        size += sum(_deep_size(key, seen) + _deep_size(value, seen) for key, value in obj.items())
+    elif isinstance(obj, (list, tuple)):
+        size += sum(_deep_size(item, seen) for item in obj)
+    return size
+
+
+@dataclass
+class CourseSnapshot:
+    """
+    Modules, materials and assignments of one course, kept until its live
+    classes end or the snapshot is PREFETCH_MAX_AGE_SECONDS old, whichever
+    comes first.
+    """
+    course_id: int
+    starts_at: datetime
+    expires_at: datetime
+    rows: Dict[str, List[Dict[str, Any]]]
+    loaded_at: Optional[datetime] = None
+    size: int = 0
+    hits: int = 0
+
+    def __post_init__(self):
+        if self.loaded_at is None:
+            self.loaded_at = datetime.utcnow()
+
+    @property
+    def valid_until(self) -> datetime:
+        return min(self.expires_at, self.loaded_at + timedelta(seconds=PREFETCH_MAX_AGE_SECONDS))
+
+    def modules(self, teacher_id: str) -> List[Dict[str, Any]]:
+        rows = [row for row in self.rows["modules"] if row.get("teacher_id") == teacher_id]
+        return sorted(rows, key=lambda row: (row.get("position") is None, row.get("position") or 0))
+
+    def module(self, module_id: int) -> Optional[Dict[str, Any]]:
+        return next((row for row in self.rows["modules"] if row.get("module_id") == module_id), None)
+
+    def by_module(self, table: str, module_id: int) -> List[Dict[str, Any]]:
+        return [row for row in self.rows[table] if row.get("module_id") == module_id]
+
+
+class PrefetchCache:
+    """
+    Course snapshots within a byte budget. When full, snapshots for classes
+    that start latest are evicted first; a snapshot that still does not fit
+    is not cached. Snapshot sizes are the in-memory size of the parsed rows.
+    """
+
+    def __init__(self, budget_bytes: int):
+        self.budget_bytes = budget_bytes
+        self._entries: Dict[int, CourseSnapshot] = {}
+        self._generations: Dict[int, int] = {}
+        self._lock = threading.Lock()
+        self.used_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.rejected = 0
+
+    def generation(self, course_id: int) -> int:
+        with self._lock:
+            return self._generations.get(course_id, 0)
+
+    def get(self, course_id: int) -> Optional[CourseSnapshot]:
+        with self._lock:
+            snapshot = self._entries.get(course_id)
+            if snapshot is not None and snapshot.valid_until < datetime.utcnow():
+                self._drop(course_id)
+                snapshot = None
+            if snapshot is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                snapshot.hits += 1
+            return snapshot
+
+    def contains(self, course_id: int, until: Optional[datetime] = None) -> bool:
+        """True if the course is cached and, with until, stays valid past it."""
+        with self._lock:
+            snapshot = self._entries.get(course_id)
+            return snapshot is not None and (until is None or snapshot.valid_until > until)
+
+    def put(self, snapshot: CourseSnapshot, generation: int) -> bool:
+        snapshot.size = _deep_size(snapshot.rows, set())
+        with self._lock:
+            if self._generations.get(snapshot.course_id, 0) != generation:
+                return False
+            self._drop(snapshot.course_id)
+            while self.used_bytes + snapshot.size > self.budget_bytes:
+                victim = max(self._entries.values(), key=lambda entry: entry.starts_at, default=None)
+                if victim is None or victim.starts_at <= snapshot.starts_at:
+                    self.rejected += 1
+                    return False
+                self._drop(victim.course_id)
+                self.evictions += 1
+            self._entries[snapshot.course_id] = snapshot
+            self.used_bytes += snapshot.size
+            return True
+
+    def _drop(self, course_id: int) -> None:
+        # Caller holds self._lock.
+        snapshot = self._entries.pop(course_id, None)
+        if snapshot is not None:
+            self.used_bytes -= snapshot.size
+
+    def invalidate(self, course_id: int) -> None:
+        with self._lock:
+            self._drop(course_id)
+            self._generations[course_id] = self._generations.get(course_id, 0) + 1
+
+    def evict_expired(self, now: datetime) -> int:
+        with self._lock:
+            expired = [course_id for course_id, entry in self._entries.items() if entry.valid_until < now]
+            for course_id in expired:
+                self._drop(course_id)
+            return len(expired)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "courses": len(self._entries),
+                "used_bytes": self.used_bytes,
+                "budget_bytes": self.budget_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "rejected": self.rejected,
+                "entries": [
+                    {"course_id": entry.course_id, "starts_at": entry.starts_at, "expires_at": entry.expires_at,
+                     "loaded_at": entry.loaded_at, "size": entry.size, "hits": entry.hits}
+                    for entry in sorted(self._entries.values(), key=lambda entry: entry.starts_at)
+                ],
+            }
+
+
+course_cache = PrefetchCache(int(PREFETCH_MEMORY_MB * 1024 * 1024))
+
+
+def _fetch(table: str, order_column: str, build) -> List[Dict[str, Any]]:
+    # Primary, so a lagging replica cannot pin stale rows until the class ends.
+    # Paged, so a snapshot never holds a list truncated at max-rows.
+    supabase = get_primary_client()
+    return fetch_all(lambda: build(supabase.table(table).select("*")), order_column, f"DB error prefetching {table}")
+
+
+class PrefetchScheduler:
+    """
+    Every PREFETCH_INTERVAL_SECONDS, finds live classes starting within
+    PREFETCH_LEAD_MINUTES (or already running) and loads their courses into
+    course_cache, so the burst of reads when a class starts is served from
+    memory. Snapshots expire when the course's last such class ends.
+    """
+
+    def __init__(self, cache: PrefetchCache, lead: timedelta, interval: float):
+        self.cache = cache
+        self.lead = lead
+        self.interval = interval
+        self.last_run: Optional[datetime] = None
+        self.last_error: Optional[str] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def upcoming_courses(self, now: datetime) -> List[Dict[str, Any]]:
+        horizon = (now + self.lead).isoformat()
+        rows = _fetch("live_classes", "class_id", lambda q: q.lte("start_time", horizon).gte("end_time", now.isoformat()))
+        courses: Dict[int, Dict[str, Any]] = {}
+        for row in rows:
+            start, end = parse_timestamp(row.get("start_time")), parse_timestamp(row.get("end_time"))
+            if start is None or end is None:
+                continue
+            course = courses.setdefault(row["course_id"], {"course_id": row["course_id"], "starts_at": start, "expires_at": end})
+            course["starts_at"] = min(course["starts_at"], start)
+            course["expires_at"] = max(course["expires_at"], end)
+        return sorted(courses.values(), key=lambda course: course["starts_at"])
+
+    def load(self, course: Dict[str, Any]) -> CourseSnapshot:
+        course_id = course["course_id"]
+        rows = {
+            table: _fetch(table, pk, lambda q: q.eq("course_id", course_id))
+            for table, pk in PREFETCH_TABLES.items()
+        }
+        return CourseSnapshot(course_id, course["starts_at"], course["expires_at"], rows)
+
+    def run_once(self) -> int:
+        """
+        Evict ended classes and warm upcoming ones, reloading snapshots that
+        would go stale before the next run. Returns the number of courses loaded.
+        """
+        now = datetime.utcnow()
+        self.cache.evict_expired(now)
+        next_run = now + timedelta(seconds=self.interval)
+        loaded = 0
+        for course in self.upcoming_courses(now):
+            if self.cache.contains(course["course_id"], until=next_run):
+                continue
+            generation = self.cache.generation(course["course_id"])
+            if not self.cache.put(self.load(course), generation):
+                continue
+            loaded += 1
+        self.last_run = now
+        if loaded:
+            logger.info("Prefetched %d course(s) ahead of live classes", loaded)
+        return loaded
+
+    async def _loop(self) -> None:
+        while True:
+            try:
+                await asyncio.to_thread(self.run_once)
+                self.last_error = None
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:
+                self.last_error = str(exc)
+                logger.exception("Prefetch run failed")
+            await asyncio.sleep(self.interval)
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.get_running_loop().create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "running": self._task is not None,
+            "lead_minutes": self.lead.total_seconds() / 60,
+            "interval_seconds": self.interval,
+            "last_run": self.last_run,
+            "last_error": self.last_error,
+            "cache": self.cache.stats(),
+        }
+
+
+prefetcher = PrefetchScheduler(course_cache, timedelta(minutes=PREFETCH_LEAD_MINUTES), PREFETCH_INTERVAL_SECONDS)
+
+
+def _on_change(course_id: int, event: Dict[str, Any]) -> None:
+    # Writes publish synchronously, so the snapshot is gone before the write returns.
+    # The next scheduler run reloads it if the class is still upcoming.
+    if event.get("table") in PREFETCH_TABLES:
+        course_cache.invalidate(course_id)
+
+
+broker.add_listener(_on_change)
+
+
+def get_prefetch_status_logic() -> Dict[str, Any]:
+    return prefetcher.status()
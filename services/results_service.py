@@ -3,11 +3,16 @@ from uuid import UUID
 import logging
 from fastapi import HTTPException, status
 from utils.database import get_supabase_client
-from utils.auth import verify_teacher_exists
-from models.schema import Grade
+from utils.auth import verify_teacher_exists, verify_teacher_course_access
+from utils.compact import ColumnarRows
+from utils.audit import audit
+from services.student_directory import student_directory
+from models.schema import Grade, RESULT_COLUMNS
 
 logger = logging.getLogger(__name__)
 
+EXPORT_PAGE_SIZE = 1000
+
 
 def upload_results_logic(
         teacher_id: str,
@@ -60,25 +65,17 @@ def upload_results_logic(
             detail=f"Failed to verify course: {str(exc)}"
         )
 
-    # 3. Verify student exists and fetch student_name
+    # 3. Verify student exists and fetch student_name (cached directory; unknown
+    #    ids are rejected by its membership filter without a database call)
     try:
-        student_resp = supabase.table("students").select("id, name").eq("id", str(student_id)).execute()
-
-        if getattr(student_resp, "error", None):
-            logger.error("DB error checking student: %s", student_resp.error)
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="DB error checking student"
-            )
+        student_name = student_directory.resolve(student_id)
 
-        if not student_resp.data:
+        if student_name is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail=f"Student with ID {student_id} not found"
             )
 
-        student_name = student_resp.data[0]["name"]
-
     except HTTPException:
         raise
     except Exception as exc:
@@ -149,6 +146,8 @@ def upload_results_logic(
                 detail="No result returned from database"
             )
 
+        audit.emit(teacher_id, "results.create", "results", data[0].get("result_id"), course_id,
+                   {"student_id": str(student_id), "assignment_id": assignment_id, "result": result.value})
         return data[0]
 
     except HTTPException:
@@ -159,3 +158,45 @@ def upload_results_logic(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=str(exc)
         )
+
+
+def export_results_logic(teacher_id: str, course_id: int) -> ColumnarRows:
+    """
+    Load every result for a course into a compact columnar container, one
+    page at a time. Callers convert rows to Result models as they emit them.
+    """
+    verify_teacher_course_access(teacher_id, course_id)
+    supabase = get_supabase_client()
+    rows = ColumnarRows(RESULT_COLUMNS)
+
+    try:
+        start = 0
+        while True:
+            resp = supabase.table("results") \
+                .select("*") \
+                .eq("course_id", course_id) \
+                .order("result_id") \
+                .range(start, start + EXPORT_PAGE_SIZE - 1) \
+                .execute()
+
+            if getattr(resp, "error", None):
+                logger.error("DB error exporting results: %s", resp.error)
+                raise HTTPException(
+                    status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                    detail="DB error exporting results"
+                )
+
+            page = resp.data or []
+            rows.extend(page)
+            if len(page) < EXPORT_PAGE_SIZE:
+                return rows
+            start += EXPORT_PAGE_SIZE
+
+    except HTTPException:
+        raise
+    except Exception as exc:
+        logger.exception("Unexpected error exporting results")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=str(exc)
+        )
@@ -0,0 +1,227 @@
+# python
+# File: services/student_directory.py
+import asyncio
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Dict, Any, Iterable, Optional
+from fastapi import HTTPException, status
+from utils.database import get_supabase_client
+from utils.bloom import BloomFilter
+
+logger = logging.getLogger(__name__)
+
+STUDENT_CACHE_SIZE = int(os.getenv("STUDENT_CACHE_SIZE", "50000"))
+# Full reload of the membership filter at most this old.
+STUDENT_DIRECTORY_REFRESH_SECONDS = float(os.getenv("STUDENT_DIRECTORY_REFRESH_SECONDS", "300"))
+# A student found in the database but missing from the filter triggers an
+# early background reload if the filter is at least this old.
+STUDENT_DIRECTORY_MIN_REFRESH_SECONDS = float(os.getenv("STUDENT_DIRECTORY_MIN_REFRESH_SECONDS", "60"))
+STUDENT_DIRECTORY_PAGE_SIZE = 1000
+
+
+class StudentDirectory:
+    """
+    In-process directory of students: a Bloom filter of every known id and
+    a bounded LRU of id -> name. Ids that miss the LRU are resolved with one
+    batched query. The filter may predate recently created students, so ids
+    it rejects are still checked in that query; if any turn out to exist,
+    the background task is asked to reload the filter.
+    """
+
+    def __init__(
+            self,
+            max_names: int = STUDENT_CACHE_SIZE,
+            refresh_seconds: float = STUDENT_DIRECTORY_REFRESH_SECONDS,
+            min_refresh_seconds: float = STUDENT_DIRECTORY_MIN_REFRESH_SECONDS,
+    ):
+        self.max_names = max_names
+        self.refresh_seconds = refresh_seconds
+        self.min_refresh_seconds = min_refresh_seconds
+        self._names: "OrderedDict[str, str]" = OrderedDict()
+        self._filter: Optional[BloomFilter] = None
+        self._loaded_at = float("-inf")
+        self._attempted_at = float("-inf")
+        self._lock = threading.Lock()
+        self._load_lock = threading.Lock()
+        self._task: Optional[asyncio.Task] = None
+        self._event_loop: Optional[asyncio.AbstractEventLoop] = None
+        self._wake: Optional[asyncio.Event] = None
+        self.metrics: Dict[str, int] = {
+            "hits": 0, "misses": 0, "filter_rejections": 0, "false_positives": 0,
+            "db_lookups": 0, "refreshes": 0, "refresh_failures": 0, "stale_rejections": 0,
+        }
+
+    def _count(self, metric: str, n: int = 1) -> None:
+        with self._lock:
+            self.metrics[metric] += n
+
+    def _remember(self, student_id: str, name: str) -> None:
+        # Caller holds self._lock.
+        self._names[student_id] = name
+        self._names.move_to_end(student_id)
+        while len(self._names) > self.max_names:
+            self._names.popitem(last=False)
+
+    def _due(self, max_age: float) -> bool:
+        """True if the filter is older than max_age and no load was attempted since."""
+        now = time.monotonic()
+        return now - self._loaded_at > max_age and now - self._attempted_at > self.min_refresh_seconds
+
+    def warm(self, max_age: Optional[float] = None) -> None:
+        """
+        Bulk-load every student id (and as many names as fit) in pages.
+        With max_age, skip the load unless it is still due once the load
+        lock is held, so concurrent callers collapse into one reload.
+        """
+        with self._load_lock:
+            if max_age is not None and not self._due(max_age):
+                return
+            self._attempted_at = time.monotonic()
+            supabase = get_supabase_client()
+            rows = []
+            start = 0
+            try:
+                while True:
+                    resp = supabase.table("students") \
+                        .select("id, name") \
+                        .order("id") \
+                        .range(start, start + STUDENT_DIRECTORY_PAGE_SIZE - 1) \
+                        .execute()
+                    if getattr(resp, "error", None):
+                        raise RuntimeError(resp.error)
+                    page = resp.data or []
+                    rows.extend(page)
+                    if len(page) < STUDENT_DIRECTORY_PAGE_SIZE:
+                        break
+                    start += STUDENT_DIRECTORY_PAGE_SIZE
+            except Exception:
+                logger.exception("Failed to load student directory")
+                self._count("refresh_failures")
+                return
+
+            bloom = BloomFilter(capacity=int(len(rows) * 1.25) + 1000)
+            bloom.update(str(row["id"]) for row in rows)
+            with self._lock:
+                self._filter = bloom
+                self._loaded_at = time.monotonic()
+                self._names.clear()
+                for row in rows[-self.max_names:]:
+                    self._remember(str(row["id"]), row["name"])
+                self.metrics["refreshes"] += 1
+            logger.info("Student directory loaded: %d students, filter %d bytes", len(rows), bloom.nbytes)
+
+    def _filter_age(self) -> float:
+        return time.monotonic() - self._loaded_at
+
+    async def _loop(self) -> None:
+        max_age = self.refresh_seconds
+        while True:
+            try:
+                await asyncio.to_thread(self.warm, max_age)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception("Student directory refresh failed")
+            try:
+                await asyncio.wait_for(self._wake.wait(), timeout=min(self.refresh_seconds, self.min_refresh_seconds))
+                max_age = self.min_refresh_seconds
+            except asyncio.TimeoutError:
+                max_age = self.refresh_seconds
+            self._wake.clear()
+
+    def request_reload(self) -> None:
+        """Ask the background task for an early (throttled) reload. Safe from any thread."""
+        if self._event_loop is not None and self._wake is not None:
+            self._event_loop.call_soon_threadsafe(self._wake.set)
+
+    def start(self) -> None:
+        """Load and periodically refresh the directory off the request path."""
+        if self._task is None:
+            self._event_loop = asyncio.get_running_loop()
+            self._wake = asyncio.Event()
+            self._task = self._event_loop.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+            self._event_loop = None
+
+    def resolve_many(self, student_ids: Iterable[Any]) -> Dict[str, str]:
+        """
+        Return {student_id: name} for the ids that exist. Unknown ids are
+        simply absent from the result.
+        """
+        ids = list(dict.fromkeys(str(student_id) for student_id in student_ids))
+
+        found: Dict[str, str] = {}
+        to_fetch = []
+        rejected = set()
+        with self._lock:
+            bloom = self._filter
+            for student_id in ids:
+                name = self._names.get(student_id)
+                if name is not None:
+                    self._names.move_to_end(student_id)
+                    found[student_id] = name
+                    self.metrics["hits"] += 1
+                else:
+                    if bloom is not None and student_id not in bloom:
+                        rejected.add(student_id)
+                        self.metrics["filter_rejections"] += 1
+                    to_fetch.append(student_id)
+                    self.metrics["misses"] += 1
+
+        if to_fetch:
+            rows = self._fetch(to_fetch)
+            found.update(rows)
+            if bloom is not None:
+                self._count("false_positives", len(set(to_fetch) - rejected - set(rows)))
+            stale = rejected.intersection(rows)
+            if stale:
+                # Students created since the filter was loaded.
+                self._count("stale_rejections", len(stale))
+                if self._due(self.min_refresh_seconds):
+                    self.request_reload()
+        return found
+
+    def resolve(self, student_id: Any) -> Optional[str]:
+        return self.resolve_many([student_id]).get(str(student_id))
+
+    def _fetch(self, student_ids) -> Dict[str, str]:
+        supabase = get_supabase_client()
+        resp = supabase.table("students").select("id, name").in_("id", list(student_ids)).execute()
+        if getattr(resp, "error", None):
+            logger.error("DB error checking students: %s", resp.error)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="DB error checking students")
+        rows = {str(row["id"]): row["name"] for row in (resp.data or [])}
+        with self._lock:
+            self.metrics["db_lookups"] += 1
+            for student_id, name in rows.items():
+                self._remember(student_id, name)
+        return rows
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            bloom = self._filter
+            return {
+                **self.metrics,
+                "cached_names": len(self._names),
+                "filter_entries": bloom.count if bloom else 0,
+                "filter_bytes": bloom.nbytes if bloom else 0,
+                "filter_age_seconds": None if bloom is None else round(self._filter_age(), 1),
+            }
+
+
+student_directory = StudentDirectory()
+
+
+def get_student_directory_stats_logic() -> Dict[str, Any]:
+    return student_directory.stats()
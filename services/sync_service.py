@@ -0,0 +1,227 @@
+# python
+# File: services/sync_service.py
+import base64
+import binascii
+import logging
+import os
+from datetime import datetime, timedelta
+from typing import Dict, Any, List, Optional
+from fastapi import HTTPException, status
+from utils.database import get_supabase_client, fetch_all
+from utils.auth import verify_teacher_course_access
+from utils.broker import broker
+from utils.audit import audit
+from utils.timestamps import parse_timestamp
+from services.course_service import get_teacher_course_ids
+
+logger = logging.getLogger(__name__)
+
+# Tables exposed through delta sync, mapped to their primary key column.
+SYNC_TABLES: Dict[str, str] = {
+    "modules": "module_id",
+    "course_materials": "material_id",
+    "assignments": "assignment_id",
+}
+
+SYNC_PAGE_SIZE = 500
+# change_id comes from a sequence and each change is its own insert, so a lower
+# id can commit after a higher one is already visible. Entries younger than
+# this are held back (and everything after them) so the cursor never passes
+# an id that is still in flight.
+SYNC_SETTLE_SECONDS = float(os.getenv("SYNC_SETTLE_SECONDS", "5"))
+_TOKEN_PREFIX = "v1:"
+
+
+def encode_sync_token(change_id: int) -> str:
+    raw = f"{_TOKEN_PREFIX}{change_id}".encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_sync_token(token: str) -> int:
+    try:
+        padded = token + "=" * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(padded.encode()).decode()
+        if not raw.startswith(_TOKEN_PREFIX):
+            raise ValueError(raw)
+        return int(raw[len(_TOKEN_PREFIX):])
+    except (ValueError, binascii.Error, UnicodeDecodeError):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid sync token")
+
+
+def record_change(teacher_id: str, table: str, row_id: int, course_id: Optional[int], op: str = "upsert") -> None:
+    """
+    Append a change to sync_log and push it to subscribed clients. Failures are
+    logged and swallowed so a sync bookkeeping problem never fails the write
+    that triggered it.
+    """
+    if table not in SYNC_TABLES or row_id is None:
+        return
+    event: Dict[str, Any] = {"table": table, "row_id": row_id, "course_id": course_id, "op": op}
+    audit.emit(teacher_id, f"{table}.{op}", table, row_id, course_id)
+    try:
+        supabase = get_supabase_client()
+        resp = supabase.table("sync_log").insert({
+            "table_name": table,
+            "row_id": row_id,
+            "course_id": course_id,
+            "teacher_id": teacher_id,
+            "op": op,
+        }).execute()
+        # No sync_token on the pushed event: it could point past ids still in
+        # flight. Clients fetch /sync/changes with their own token instead.
+        if getattr(resp, "error", None):
+            logger.error("Failed to record %s change for %s %s: %s", op, table, row_id, resp.error)
+    except Exception:
+        logger.exception("Failed to record %s change for %s %s", op, table, row_id)
+    if course_id is not None:
+        broker.publish(course_id, event)
+
+
+def record_changes(teacher_id: str, table: str, row_ids: List[int], course_id: Optional[int], op: str = "upsert") -> None:
+    """
+    Batch form of record_change for bulk writes: one sync_log insert for all rows.
+    """
+    row_ids = [row_id for row_id in row_ids if row_id is not None]
+    if table not in SYNC_TABLES or not row_ids:
+        return
+    for row_id in row_ids:
+        audit.emit(teacher_id, f"{table}.{op}", table, row_id, course_id)
+    try:
+        supabase = get_supabase_client()
+        resp = supabase.table("sync_log").insert([
+            {"table_name": table, "row_id": row_id, "course_id": course_id, "teacher_id": teacher_id, "op": op}
+            for row_id in row_ids
+        ]).execute()
+        if getattr(resp, "error", None):
+            logger.error("Failed to record %d %s changes for %s: %s", len(row_ids), op, table, resp.error)
+    except Exception:
+        logger.exception("Failed to record %d %s changes for %s", len(row_ids), op, table)
+    if course_id is not None:
+        for row_id in row_ids:
+            broker.publish(course_id, {"table": table, "row_id": row_id, "course_id": course_id, "op": op})
+
+
+def _teacher_course_ids(teacher_id: str, course_id: Optional[int]) -> List[int]:
+    if course_id is not None:
+        verify_teacher_course_access(teacher_id, course_id)
+        return [course_id]
+    return get_teacher_course_ids(teacher_id)
+
+
+def _settled_change_id() -> int:
+    """
+    Newest change_id older than SYNC_SETTLE_SECONDS. Snapshot tokens start
+    here rather than at the newest id, so lower ids still in flight are
+    picked up by the next delta call.
+    """
+    cutoff = datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+    supabase = get_supabase_client()
+    resp = supabase.table("sync_log") \
+        .select("change_id") \
+        .lte("changed_at", cutoff.isoformat() + "+00:00") \
+        .order("change_id", desc=True) \
+        .limit(1) \
+        .execute()
+    if getattr(resp, "error", None):
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="DB error reading sync log")
+    return resp.data[0]["change_id"] if resp.data else 0
+
+
+def _fetch_course_rows(table: str, course_ids: List[int]) -> List[Dict[str, Any]]:
+    """All rows of a table for the given courses, paged past max-rows."""
+    if not course_ids:
+        return []
+    supabase = get_supabase_client()
+    return fetch_all(lambda: supabase.table(table).select("*").in_("course_id", course_ids),
+                     SYNC_TABLES[table], f"DB error fetching {table}")
+
+
+def _fetch_rows(table: str, column: str, values: List[Any]) -> List[Dict[str, Any]]:
+    if not values:
+        return []
+    supabase = get_supabase_client()
+    resp = supabase.table(table).select("*").in_(column, values).execute()
+    if getattr(resp, "error", None):
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=f"DB error fetching {table}")
+    return resp.data or []
+
+
+def _empty_changes() -> Dict[str, Dict[str, list]]:
+    return {table: {"upserted": [], "deleted": []} for table in SYNC_TABLES}
+
+
+def get_changes_logic(teacher_id: str, since: Optional[str] = None, course_id: Optional[int] = None) -> Dict[str, Any]:
+    """
+    Return rows in modules, course_materials and assignments changed since the
+    given sync token, plus tombstones for deleted rows and a new token.
+
+    Without a token a full snapshot of the teacher's courses is returned, along
+    with a token pointing at the last settled entry of the change log.
+    """
+    course_ids = _teacher_course_ids(teacher_id, course_id)
+    changes = _empty_changes()
+
+    try:
+        if since is None:
+            latest = _settled_change_id()
+            for table in SYNC_TABLES:
+                changes[table]["upserted"] = _fetch_course_rows(table, course_ids)
+            return {"changes": changes, "sync_token": encode_sync_token(latest), "has_more": False, "full": True}
+
+        cursor = decode_sync_token(since)
+        if not course_ids:
+            return {"changes": changes, "sync_token": since, "has_more": False, "full": False}
+
+        supabase = get_supabase_client()
+        resp = supabase.table("sync_log") \
+            .select("change_id, table_name, row_id, op, changed_at") \
+            .gt("change_id", cursor) \
+            .in_("course_id", course_ids) \
+            .order("change_id") \
+            .limit(SYNC_PAGE_SIZE + 1) \
+            .execute()
+        if getattr(resp, "error", None):
+            logger.error("DB error reading sync log: %s", resp.error)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="DB error reading sync log")
+
+        entries = resp.data or []
+        has_more = len(entries) > SYNC_PAGE_SIZE
+        entries = entries[:SYNC_PAGE_SIZE]
+        cutoff = datetime.utcnow() - timedelta(seconds=SYNC_SETTLE_SECONDS)
+        for index, entry in enumerate(entries):
+            changed_at = parse_timestamp(entry.get("changed_at"))
+            if changed_at is not None and changed_at > cutoff:
+                entries, has_more = entries[:index], False
+                break
+        if not entries:
+            return {"changes": changes, "sync_token": since, "has_more": False, "full": False}
+
+        # Collapse to the last operation per row; later entries win.
+        last_op: Dict[str, Dict[Any, str]] = {table: {} for table in SYNC_TABLES}
+        for entry in entries:
+            table = entry["table_name"]
+            if table in last_op:
+                last_op[table][entry["row_id"]] = entry["op"]
+
+        for table, ops in last_op.items():
+            pk = SYNC_TABLES[table]
+            upsert_ids = [row_id for row_id, op in ops.items() if op == "upsert"]
+            rows = _fetch_rows(table, pk, upsert_ids)
+            found = {row[pk] for row in rows}
+            changes[table]["upserted"] = rows
+            # Rows logged as upserts but already gone are reported as deletions.
+            changes[table]["deleted"] = [
+                row_id for row_id, op in ops.items() if op == "delete" or row_id not in found
+            ]
+
+        return {
+            "changes": changes,
+            "sync_token": encode_sync_token(entries[-1]["change_id"]),
+            "has_more": has_more,
+            "full": False,
+        }
+    except HTTPException:
+        raise
+    except Exception as exc:
+        logger.exception("Unexpected error computing sync changes")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=str(exc))
@@ -0,0 +1,251 @@
+# python
+# File: services/upload_service.py
+import base64
+import logging
+import os
+import re
+import uuid
+from datetime import datetime
+from typing import Any, AsyncIterator, Dict, Optional
+import httpx
+from fastapi import HTTPException, UploadFile, status
+from fastapi.concurrency import run_in_threadpool
+from utils.database import SUPABASE_URL, SUPABASE_KEY, get_primary_client
+from utils.auth import verify_teacher_course_access
+from services.module_service import verify_module_owner
+from services.materials_service import upload_lecture_notes_logic
+from services.assignments_service import upload_assignment_logic
+
+logger = logging.getLogger(__name__)
+
+# Must be a public bucket: rows store its public URL, which students open directly.
+STORAGE_BUCKET = os.getenv("STORAGE_BUCKET", "course-files")
+# Supabase's resumable (TUS) endpoint expects 6 MiB chunks.
+UPLOAD_CHUNK_SIZE = int(os.getenv("UPLOAD_CHUNK_SIZE", str(6 * 1024 * 1024)))
+RESUMABLE_THRESHOLD = int(os.getenv("RESUMABLE_UPLOAD_THRESHOLD", str(50 * 1024 * 1024)))
+UPLOAD_MAX_RETRIES = int(os.getenv("UPLOAD_MAX_RETRIES", "3"))
+UPLOAD_KINDS = ("materials", "assignments")
+
+_SAFE_NAME_RE = re.compile(r"[^A-Za-z0-9._-]+")
+
+
+def _storage_headers() -> Dict[str, str]:
+    return {"Authorization": f"Bearer {SUPABASE_KEY}", "apikey": SUPABASE_KEY}
+
+
+def object_path(course_id: int, kind: str, filename: str) -> str:
+    safe_name = _SAFE_NAME_RE.sub("_", os.path.basename(filename or "file")).strip("._") or "file"
+    return f"courses/{course_id}/{kind}/{uuid.uuid4().hex}-{safe_name}"
+
+
+def object_url(path: str) -> str:
+    """Public download URL stored as the row's file_path, like existing file_link values."""
+    return get_primary_client().storage.from_(STORAGE_BUCKET).get_public_url(path)
+
+
+def verify_upload_target(teacher_id: str, course_id: int, module_id: Optional[int] = None) -> None:
+    """Run access checks before any bytes are sent to storage."""
+    verify_teacher_course_access(teacher_id, course_id)
+    if module_id is not None:
+        module = verify_module_owner(module_id, teacher_id)
+        if module["course_id"] != course_id:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Module does not belong to specified course")
+
+
+async def _iter_chunks(file: UploadFile, chunk_size: int = UPLOAD_CHUNK_SIZE) -> AsyncIterator[bytes]:
+    while True:
+        chunk = await file.read(chunk_size)
+        if not chunk:
+            break
+        yield chunk
+
+
+async def _read_exact(file: UploadFile, size: int) -> bytes:
+    # UploadFile.read may return fewer bytes than asked; TUS chunks must be full.
+    parts = []
+    remaining = size
+    while remaining > 0:
+        chunk = await file.read(remaining)
+        if not chunk:
+            break
+        parts.append(chunk)
+        remaining -= len(chunk)
+    return b"".join(parts)
+
+
+def _spooled_size(fileobj) -> int:
+    fileobj.seek(0, os.SEEK_END)
+    size = fileobj.tell()
+    fileobj.seek(0)
+    return size
+
+
+async def _stream_upload(client: httpx.AsyncClient, file: UploadFile, path: str) -> None:
+    """Single request; the body is streamed from the spooled upload in chunks."""
+    resp = await client.post(
+        f"{SUPABASE_URL}/storage/v1/object/{STORAGE_BUCKET}/{path}",
+        content=_iter_chunks(file),
+        headers={
+            **_storage_headers(),
+            "Content-Type": file.content_type or "application/octet-stream",
+            "x-upsert": "false",
+        },
+    )
+    if resp.status_code >= 400:
+        logger.error("Storage upload failed (%s): %s", resp.status_code, resp.text)
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to upload file to storage")
+
+
+def _tus_metadata(path: str, content_type: str) -> str:
+    fields = {"bucketName": STORAGE_BUCKET, "objectName": path, "contentType": content_type}
+    return ",".join(f"{key} {base64.b64encode(value.encode()).decode()}" for key, value in fields.items())
+
+
+async def _resumable_upload(client: httpx.AsyncClient, file: UploadFile, path: str, size: int) -> None:
+    """
+    TUS upload in UPLOAD_CHUNK_SIZE pieces. A failed chunk is retried from
+    the offset the server reports, so a dropped connection resends at most
+    one chunk.
+    """
+    headers = {**_storage_headers(), "Tus-Resumable": "1.0.0"}
+    content_type = file.content_type or "application/octet-stream"
+    create = await client.post(
+        f"{SUPABASE_URL}/storage/v1/upload/resumable",
+        headers={**headers, "Upload-Length": str(size), "Upload-Metadata": _tus_metadata(path, content_type)},
+    )
+    location = create.headers.get("Location")
+    if create.status_code != 201 or not location:
+        logger.error("Resumable upload creation failed (%s): %s", create.status_code, create.text)
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to start resumable upload")
+    if location.startswith("/"):
+        location = SUPABASE_URL.rstrip("/") + location
+
+    offset = 0
+    retries = 0
+    while offset < size:
+        await file.seek(offset)
+        chunk = await _read_exact(file, min(UPLOAD_CHUNK_SIZE, size - offset))
+        try:
+            resp = await client.patch(
+                location,
+                content=chunk,
+                headers={**headers, "Upload-Offset": str(offset), "Content-Type": "application/offset+octet-stream"},
+            )
+            if resp.status_code != 204:
+                raise httpx.HTTPStatusError(resp.text, request=resp.request, response=resp)
+            offset = int(resp.headers.get("Upload-Offset", offset + len(chunk)))
+            retries = 0
+        except httpx.HTTPError:
+            retries += 1
+            if retries > UPLOAD_MAX_RETRIES:
+                logger.exception("Resumable upload of %s failed at offset %d", path, offset)
+                raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail="Failed to upload file to storage")
+            try:
+                head = await client.head(location, headers=headers)
+            except httpx.HTTPError:
+                # Retry the chunk from the last known offset.
+                continue
+            if head.status_code == 200 and "Upload-Offset" in head.headers:
+                offset = int(head.headers["Upload-Offset"])
+
+
+async def store_upload(file: UploadFile, course_id: int, kind: str) -> str:
+    """
+    Stream an UploadFile to storage and return its object path. Files larger
+    than RESUMABLE_THRESHOLD (e.g. lecture videos) use chunked TUS uploads.
+    """
+    path = object_path(course_id, kind, file.filename)
+    size = file.size
+    if size is None:
+        size = await run_in_threadpool(_spooled_size, file.file)
+
+    async with httpx.AsyncClient(timeout=httpx.Timeout(60.0, connect=10.0)) as client:
+        if size > RESUMABLE_THRESHOLD:
+            await _resumable_upload(client, file, path, size)
+        else:
+            await _stream_upload(client, file, path)
+    return path
+
+
+def _remove_object(path: str) -> None:
+    try:
+        get_primary_client().storage.from_(STORAGE_BUCKET).remove([path])
+    except Exception:
+        logger.exception("Failed to clean up orphaned upload %s", path)
+
+
+async def upload_material_file_logic(
+        teacher_id: str,
+        course_id: int,
+        material_title: str,
+        file: UploadFile,
+        module_id: Optional[int] = None,
+):
+    """Upload the file, then insert the course_materials row pointing at it."""
+    await run_in_threadpool(verify_upload_target, teacher_id, course_id, module_id)
+    path = await store_upload(file, course_id, "materials")
+    try:
+        return await run_in_threadpool(
+            upload_lecture_notes_logic, teacher_id, course_id, material_title, object_url(path), module_id
+        )
+    except Exception:
+        await run_in_threadpool(_remove_object, path)
+        raise
+
+
+async def upload_assignment_file_logic(
+        teacher_id: str,
+        course_id: int,
+        assignment_title: str,
+        file: UploadFile,
+        description: Optional[str] = None,
+        due_date: Optional[datetime] = None,
+        module_id: Optional[int] = None,
+) -> Dict[str, Any]:
+    """Upload the file, then insert the assignments row pointing at it."""
+    await run_in_threadpool(verify_upload_target, teacher_id, course_id, module_id)
+    path = await store_upload(file, course_id, "assignments")
+    try:
+        return await run_in_threadpool(
+            upload_assignment_logic, teacher_id, course_id, assignment_title, description, due_date,
+            object_url(path), module_id
+        )
+    except Exception:
+        await run_in_threadpool(_remove_object, path)
+        raise
+
+
+def create_upload_url_logic(teacher_id: str, course_id: int, kind: str, filename: str) -> Dict[str, Any]:
+    """
+    Issue a presigned upload URL so the client sends bytes straight to
+    storage. Finish with the matching upload-complete endpoint.
+    """
+    if kind not in UPLOAD_KINDS:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"kind must be one of {UPLOAD_KINDS}")
+    verify_teacher_course_access(teacher_id, course_id)
+    path = object_path(course_id, kind, filename)
+    try:
+        signed = get_primary_client().storage.from_(STORAGE_BUCKET).create_signed_upload_url(path)
+    except Exception as exc:
+        logger.exception("Failed to create signed upload URL")
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc))
+    return {"signed_url": signed["signed_url"], "token": signed["token"], "path": path}
+
+
+def resolve_uploaded_object(teacher_id: str, course_id: int, kind: str, path: str, module_id: Optional[int] = None) -> str:
+    """
+    Check a client-reported object path was issued for this course and kind
+    and actually exists, and return its URL for the database row. Access is
+    checked first so storage is never probed for courses the teacher can't use.
+    """
+    verify_upload_target(teacher_id, course_id, module_id)
+    if not path.startswith(f"courses/{course_id}/{kind}/") or ".." in path:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Upload path does not belong to this course")
+    try:
+        exists = get_primary_client().storage.from_(STORAGE_BUCKET).exists(path)
+    except Exception as exc:
+        logger.exception("Failed to check uploaded object")
+        raise HTTPException(status_code=status.HTTP_502_BAD_GATEWAY, detail=str(exc))
+    if not exists:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Uploaded file not found in storage")
+    return object_url(path)
@@ -0,0 +1,179 @@
+# python
+# File: utils/audit.py
+import json
+import logging
+import os
+import queue
+import random
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+AUDIT_QUEUE_SIZE = int(os.getenv("AUDIT_QUEUE_SIZE", "10000"))
+AUDIT_BATCH_SIZE = int(os.getenv("AUDIT_BATCH_SIZE", "200"))
+AUDIT_FLUSH_SECONDS = float(os.getenv("AUDIT_FLUSH_SECONDS", "1.0"))
+# Once the queue is this full, only AUDIT_SAMPLE_RATE of new events are kept.
+AUDIT_HIGH_WATERMARK = float(os.getenv("AUDIT_HIGH_WATERMARK", "0.8"))
+AUDIT_SAMPLE_RATE = float(os.getenv("AUDIT_SAMPLE_RATE", "0.1"))
+# "supabase" (audit_log table), "file:/path/to/audit.jsonl" or "none"
+AUDIT_SINK = os.getenv("AUDIT_SINK", "supabase")
+
+
+class AuditSink(ABC):
+    @abstractmethod
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        ...
+
+
+class SupabaseAuditSink(AuditSink):
+    """Inserts each batch into the audit_log table (migrations/005_audit_log.sql)."""
+
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        from utils.database import get_primary_client
+        resp = get_primary_client().table("audit_log").insert(events).execute()
+        if getattr(resp, "error", None):
+            raise RuntimeError(resp.error)
+
+
+class FileAuditSink(AuditSink):
+    """Appends each batch to a JSON Lines file."""
+
+    def __init__(self, path: str):
+        self.path = path
+
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        with open(self.path, "a", encoding="utf-8") as fh:
+            for event in events:
+                fh.write(json.dumps(event, default=str) + "\n")
+
+
+class NullAuditSink(AuditSink):
+    def write(self, events: List[Dict[str, Any]]) -> None:
+        pass
+
+
+class AuditPipeline:
+    """
+    Request handlers call emit(), which only enqueues. A background thread
+    drains the queue in batches to the sink. Under pressure events are
+    sampled, and when the queue is full they are dropped; both are counted
+    and reported in the next batch as an audit.shed event.
+    """
+
+    def __init__(
+            self,
+            sink: AuditSink,
+            max_queue: int = AUDIT_QUEUE_SIZE,
+            batch_size: int = AUDIT_BATCH_SIZE,
+            flush_interval: float = AUDIT_FLUSH_SECONDS,
+            high_watermark: float = AUDIT_HIGH_WATERMARK,
+            sample_rate: float = AUDIT_SAMPLE_RATE,
+    ):
+        self.sink = sink
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.sample_rate = sample_rate
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._watermark = int(max_queue * high_watermark)
+        self._shed = 0
+        self._shed_lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def emit(self, actor: Optional[str], action: str, table: Optional[str] = None, row_id: Any = None,
+             course_id: Optional[int] = None, detail: Optional[Dict[str, Any]] = None) -> None:
+        if self._queue.qsize() >= self._watermark and random.random() >= self.sample_rate:
+            self._count_shed()
+            return
+        event = {
+            "actor": actor,
+            "action": action,
+            "table_name": table,
+            "row_id": None if row_id is None else str(row_id),
+            "course_id": course_id,
+            "detail": detail,
+            "created_at": datetime.utcnow().isoformat(),
+        }
+        try:
+            self._queue.put_nowait(event)
+        except queue.Full:
+            self._count_shed()
+
+    def _count_shed(self) -> None:
+        with self._shed_lock:
+            self._shed += 1
+
+    def _take_shed(self) -> int:
+        with self._shed_lock:
+            shed, self._shed = self._shed, 0
+        return shed
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="audit-flusher", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 5.0) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+            self._thread = None
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._flush(self._collect(block=True))
+        # Drain whatever is left on shutdown.
+        while not self._queue.empty():
+            self._flush(self._collect(block=False))
+        self._flush([])
+
+    def _collect(self, block: bool) -> List[Dict[str, Any]]:
+        batch: List[Dict[str, Any]] = []
+        try:
+            if block:
+                batch.append(self._queue.get(timeout=self.flush_interval))
+            while len(batch) < self.batch_size:
+                batch.append(self._queue.get_nowait())
+        except queue.Empty:
+            pass
+        return batch
+
+    def _flush(self, batch: List[Dict[str, Any]]) -> None:
+        shed = self._take_shed()
+        if shed:
+            batch.append({
+                "actor": None, "action": "audit.shed", "table_name": None, "row_id": None,
+                "course_id": None, "detail": {"dropped": shed}, "created_at": datetime.utcnow().isoformat(),
+            })
+        if not batch:
+            return
+        try:
+            self.sink.write(batch)
+        except Exception:
+            logger.exception("Failed to flush %d audit events", len(batch))
+
+
+def _default_sink() -> AuditSink:
+    if AUDIT_SINK.startswith("file:"):
+        return FileAuditSink(AUDIT_SINK[len("file:"):])
+    if AUDIT_SINK == "none":
+        return NullAuditSink()
+    return SupabaseAuditSink()
+
+
+audit = AuditPipeline(_default_sink())
+
+
+__all__ = [
+    "AuditSink",
+    "SupabaseAuditSink",
+    "FileAuditSink",
+    "NullAuditSink",
+    "AuditPipeline",
+    "audit",
+]
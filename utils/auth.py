@@ -1,7 +1,10 @@
 # FILE: Teacher-Management-API/utils/auth.py
+import hmac
+import os
 from fastapi import Request, HTTPException, status, Depends
-# Import the specific client instance from database.py
-from .database import supabase
+# Import the client accessor from database.py; auth checks always read the primary
+from .database import get_primary_client
+from .read_routing import set_session, LAST_WRITE_COOKIE, LAST_WRITE_HEADER
 from supabase import Client # For type hinting
 
 async def verify_teacher(request: Request):
@@ -11,6 +14,7 @@ async def verify_teacher(request: Request):
     Falls back to cookies/headers for local dev.
     Returns the teacher's user_id on success.
     """
+    supabase = get_primary_client()
     if supabase is None:
          raise HTTPException(status_code=500, detail="Supabase client not initialized.")
 
@@ -38,12 +42,17 @@ async def verify_teacher(request: Request):
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Database error checking user: {str(e)}")
 
+    # Tie subsequent reads in this request to the teacher for read-your-writes routing,
+    # including writes this client made through other workers
+    set_session(user_id, request.headers.get(LAST_WRITE_HEADER) or request.cookies.get(LAST_WRITE_COOKIE))
+
     # Return just the user_id (as expected by original router code)
     return user_id
 
 # --- Helper function used by services ---
 # Keep this if your services already use it
 def verify_teacher_exists(teacher_id: str) -> None:
+    supabase = get_primary_client()
     if supabase is None:
          raise HTTPException(status_code=500, detail="Supabase client not initialized.")
     resp = supabase.table("teachers").select("id").eq("id", teacher_id).execute()
@@ -55,6 +64,7 @@ def verify_teacher_exists(teacher_id: str) -> None:
 # --- Helper function used by services ---
 # Keep this if your services already use it
 def verify_teacher_course_access(teacher_id: str, course_id: int) -> None:
+     supabase = get_primary_client()
      if supabase is None:
          raise HTTPException(status_code=500, detail="Supabase client not initialized.")
      verify_teacher_exists(teacher_id) # First check teacher exists
@@ -63,4 +73,18 @@ def verify_teacher_course_access(teacher_id: str, course_id: int) -> None:
      if getattr(resp, "error", None):
          raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="DB error checking course")
      if not resp.data:
-         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
\ No newline at end of file
+         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Course not found")
+
+
+# --- Admin access for operational endpoints (profiler etc.) ---
+async def verify_admin(request: Request):
+    """
+    Check the X-Admin-Token header against the ADMIN_TOKEN environment variable.
+    Admin endpoints are disabled entirely when ADMIN_TOKEN is not set.
+    """
+    expected = os.getenv("ADMIN_TOKEN")
+    if not expected:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Admin endpoints are disabled")
+    token = request.headers.get("X-Admin-Token", "")
+    if not hmac.compare_digest(token, expected):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Invalid admin token")
@@ -0,0 +1,116 @@
+# python
+# File: utils/broker.py
+import asyncio
+import logging
+import os
+import threading
+from typing import Any, Callable, Dict, Iterable, List, Optional, Set
+
+logger = logging.getLogger(__name__)
+
+EVENT_QUEUE_SIZE = int(os.getenv("EVENT_QUEUE_SIZE", "64"))
+MAX_SUBSCRIBERS = int(os.getenv("EVENT_MAX_SUBSCRIBERS", "10000"))
+
+
+class Subscription:
+    """
+    A single connected client. Events are buffered in a bounded queue; when the
+    client falls behind, the oldest event is dropped and counted.
+    """
+    __slots__ = ("course_ids", "queue", "loop", "dropped")
+
+    def __init__(self, course_ids: Iterable[int], queue_size: int, loop: asyncio.AbstractEventLoop):
+        self.course_ids = frozenset(course_ids)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=queue_size)
+        self.loop = loop
+        self.dropped = 0
+
+    def offer(self, event: Dict[str, Any]) -> None:
+        # Must run on self.loop; asyncio.Queue is not thread-safe.
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            try:
+                self.queue.get_nowait()
+            except asyncio.QueueEmpty:
+                pass
+            self.queue.put_nowait(event)
+            self.dropped += 1
+
+
+class ChangeBroker:
+    """
+    In-process fan-out of change events to subscribers, indexed by course_id.
+    publish() never blocks and may be called from any thread.
+    """
+
+    def __init__(self, queue_size: int = EVENT_QUEUE_SIZE, max_subscribers: int = MAX_SUBSCRIBERS):
+        self.queue_size = queue_size
+        self.max_subscribers = max_subscribers
+        self._by_course: Dict[int, Set[Subscription]] = {}
+        self._subscribers: Set[Subscription] = set()
+        self._listeners: List[Callable[[int, Dict[str, Any]], None]] = []
+        self._lock = threading.Lock()
+
+    @property
+    def subscriber_count(self) -> int:
+        return len(self._subscribers)
+
+    def add_listener(self, listener: Callable[[int, Dict[str, Any]], None]) -> None:
+        """
+        Register an in-process callback run synchronously on every publish,
+        e.g. to invalidate caches. Listeners must be fast and must not raise.
+        """
+        self._listeners.append(listener)
+
+    def subscribe(self, course_ids: Iterable[int]) -> Optional[Subscription]:
+        """
+        Register a subscriber on the running event loop. Returns None when the
+        broker is at capacity.
+        """
+        sub = Subscription(course_ids, self.queue_size, asyncio.get_running_loop())
+        with self._lock:
+            if len(self._subscribers) >= self.max_subscribers:
+                return None
+            for course_id in sub.course_ids:
+                self._by_course.setdefault(course_id, set()).add(sub)
+            self._subscribers.add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        with self._lock:
+            if sub not in self._subscribers:
+                return
+            self._subscribers.discard(sub)
+            for course_id in sub.course_ids:
+                subs = self._by_course.get(course_id)
+                if subs is not None:
+                    subs.discard(sub)
+                    if not subs:
+                        del self._by_course[course_id]
+
+    def publish(self, course_id: int, event: Dict[str, Any]) -> None:
+        for listener in self._listeners:
+            try:
+                listener(course_id, event)
+            except Exception:
+                logger.exception("Change listener failed")
+        with self._lock:
+            subs = list(self._by_course.get(course_id, ()))
+        if not subs:
+            return
+        try:
+            current = asyncio.get_running_loop()
+        except RuntimeError:
+            current = None
+        for sub in subs:
+            if sub.loop is current:
+                sub.offer(event)
+            elif not sub.loop.is_closed():
+                sub.loop.call_soon_threadsafe(sub.offer, event)
+
+
+broker = ChangeBroker()
+
+
+__all__ = ["Subscription", "ChangeBroker", "broker"]
@@ -0,0 +1,134 @@
+# python
+# File: utils/cache.py
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Generic, Hashable, List, Optional, Tuple, TypeVar
+
+V = TypeVar("V")
+
+
+class TTLCache(Generic[V]):
+    """
+    Thread-safe LRU cache whose entries expire after ttl seconds.
+
+    get_or_load() collapses concurrent misses for the same key into a single
+    load, and drops the loaded value if the key was invalidated while loading.
+    Generations are only kept for keys with a load in flight, so bookkeeping
+    stays bounded by max_entries plus concurrent loads. on_evict, if given,
+    is called with each key whose entry leaves the cache, or whose
+    loaded value is discarded because it was invalidated mid-load.
+    """
+
+    def __init__(self, ttl: float, max_entries: int = 1024, on_evict: Optional[Callable[[Hashable], None]] = None):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self._entries: "OrderedDict[Hashable, Tuple[float, V]]" = OrderedDict()
+        self._generations: Dict[Hashable, int] = {}
+        self._loading: Dict[Hashable, int] = {}
+        self._key_locks: Dict[Hashable, threading.Lock] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _evicted(self, keys: List[Hashable]) -> None:
+        # Called without self._lock held.
+        if self.on_evict is not None:
+            for key in keys:
+                self.on_evict(key)
+
+    def _lookup(self, key: Hashable, evicted: List[Hashable]) -> Optional[V]:
+        # Caller holds self._lock.
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        expires_at, value = entry
+        if expires_at < time.monotonic():
+            del self._entries[key]
+            evicted.append(key)
+            return None
+        self._entries.move_to_end(key)
+        return value
+
+    def get(self, key: Hashable) -> Optional[V]:
+        evicted: List[Hashable] = []
+        with self._lock:
+            value = self._lookup(key, evicted)
+            if value is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self._evicted(evicted)
+        return value
+
+    def set(self, key: Hashable, value: V, generation: Optional[int] = None) -> None:
+        evicted: List[Hashable] = []
+        with self._lock:
+            if generation is not None and self._generations.get(key, 0) != generation:
+                # Invalidated while loading: the value is dropped, so the key is not cached.
+                evicted.append(key)
+            else:
+                self._entries[key] = (time.monotonic() + self.ttl, value)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    evicted.append(self._entries.popitem(last=False)[0])
+        self._evicted(evicted)
+
+    def _bump(self, key: Hashable) -> None:
+        # Caller holds self._lock. Only an in-flight load can observe a generation.
+        if self._loading.get(key):
+            self._generations[key] = self._generations.get(key, 0) + 1
+        else:
+            self._generations.pop(key, None)
+
+    def invalidate(self, key: Hashable) -> None:
+        with self._lock:
+            present = self._entries.pop(key, None) is not None
+            self._bump(key)
+        self._evicted([key] if present else [])
+
+    def clear(self) -> None:
+        with self._lock:
+            evicted = list(self._entries)
+            self._entries.clear()
+            for key in list(self._generations) + list(self._loading):
+                self._bump(key)
+        self._evicted(evicted)
+
+    def values(self) -> List[V]:
+        """Snapshot of the unexpired values, e.g. to update them in place."""
+        with self._lock:
+            now = time.monotonic()
+            return [value for expires_at, value in self._entries.values() if expires_at >= now]
+
+    def get_or_load(self, key: Hashable, loader: Callable[[], V]) -> V:
+        value = self.get(key)
+        if value is not None:
+            return value
+        with self._lock:
+            key_lock = self._key_locks.setdefault(key, threading.Lock())
+        with key_lock:
+            evicted: List[Hashable] = []
+            with self._lock:
+                value = self._lookup(key, evicted)
+                generation = self._generations.get(key, 0)
+                if value is None:
+                    self._loading[key] = self._loading.get(key, 0) + 1
+            self._evicted(evicted)
+            if value is not None:
+                return value
+            try:
+                value = loader()
+                self.set(key, value, generation=generation)
+            finally:
+                with self._lock:
+                    self._key_locks.pop(key, None)
+                    self._loading[key] -= 1
+                    if not self._loading[key]:
+                        del self._loading[key]
+                        self._generations.pop(key, None)
+            return value
+
+
+__all__ = ["TTLCache"]
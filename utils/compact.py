@@ -0,0 +1,120 @@
+# python
+# File: utils/compact.py
+from array import array
+from typing import Any, Dict, Iterable, Iterator, List, Type, TypeVar
+from pydantic import BaseModel
+
+M = TypeVar("M", bound=BaseModel)
+
+# Column kinds:
+#   "int"  - integers stored in a signed 64-bit array, None as a sentinel
+#   "enum" - low-cardinality strings (titles, names, grades) dictionary-encoded
+#            into a 32-bit code array; each distinct value is stored once
+#   "obj"  - anything else, kept as a plain list
+_NULL_INT = -(2 ** 63)
+_NULL_CODE = 0xFFFFFFFF
+
+
+class _EnumColumn:
+    __slots__ = ("codes", "values", "index")
+
+    def __init__(self):
+        self.codes = array("I")
+        self.values: List[Any] = []
+        self.index: Dict[Any, int] = {}
+
+    def append(self, value: Any) -> None:
+        if value is None:
+            self.codes.append(_NULL_CODE)
+            return
+        code = self.index.get(value)
+        if code is None:
+            code = len(self.values)
+            self.index[value] = code
+            self.values.append(value)
+        self.codes.append(code)
+
+    def __getitem__(self, i: int) -> Any:
+        code = self.codes[i]
+        return None if code == _NULL_CODE else self.values[code]
+
+
+class _IntColumn:
+    __slots__ = ("data",)
+
+    def __init__(self):
+        self.data = array("q")
+
+    def append(self, value: Any) -> None:
+        self.data.append(_NULL_INT if value is None else int(value))
+
+    def __getitem__(self, i: int) -> Any:
+        value = self.data[i]
+        return None if value == _NULL_INT else value
+
+
+class _ObjColumn:
+    __slots__ = ("data",)
+
+    def __init__(self):
+        self.data: List[Any] = []
+
+    def append(self, value: Any) -> None:
+        self.data.append(value)
+
+    def __getitem__(self, i: int) -> Any:
+        return self.data[i]
+
+
+_COLUMN_TYPES = {"int": _IntColumn, "enum": _EnumColumn, "obj": _ObjColumn}
+
+
+class ColumnarRows:
+    """
+    Column-oriented container for large result sets read from Supabase.
+
+    Rows are appended as dicts (straight from resp.data) and stored one array
+    per column, so a million rows cost a few bytes per cell instead of a dict
+    and a Python object per value. Convert to public Pydantic models only at
+    the edge with to_models().
+    """
+
+    def __init__(self, schema: Dict[str, str]):
+        unknown = set(schema.values()) - set(_COLUMN_TYPES)
+        if unknown:
+            raise ValueError(f"Unknown column kinds: {sorted(unknown)}")
+        self.schema = dict(schema)
+        self._columns = {name: _COLUMN_TYPES[kind]() for name, kind in schema.items()}
+        self._length = 0
+
+    def append(self, row: Dict[str, Any]) -> None:
+        for name, column in self._columns.items():
+            column.append(row.get(name))
+        self._length += 1
+
+    def extend(self, rows: Iterable[Dict[str, Any]]) -> None:
+        for row in rows:
+            self.append(row)
+
+    def __len__(self) -> int:
+        return self._length
+
+    def column(self, name: str) -> List[Any]:
+        col = self._columns[name]
+        return [col[i] for i in range(self._length)]
+
+    def row(self, i: int) -> Dict[str, Any]:
+        if not 0 <= i < self._length:
+            raise IndexError(i)
+        return {name: column[i] for name, column in self._columns.items()}
+
+    def __iter__(self) -> Iterator[Dict[str, Any]]:
+        for i in range(self._length):
+            yield self.row(i)
+
+    def to_models(self, model: Type[M]) -> Iterator[M]:
+        for row in self:
+            yield model(**row)
+
+
+__all__ = ["ColumnarRows"]
@@ -1,9 +1,12 @@
 # python
 import os
 import logging
-from typing import Optional
+from typing import Any, Callable, Dict, List, Optional
+from fastapi import HTTPException, status
 from dotenv import load_dotenv
 from supabase import create_client, Client
+from .read_routing import RoutingClient, ReplicaLagMonitor, rpc_lag_probe
+from .profiler import TracedClient
 
 # Load environment variables from .env file (if present)
 load_dotenv()
@@ -14,6 +17,15 @@ logger = logging.getLogger(__name__)
 SUPABASE_URL: Optional[str] = os.getenv("SUPABASE_URL")
 SUPABASE_KEY: Optional[str] = os.getenv("SUPABASE_KEY")
 
+# Optional read replica; table reads are routed there when set.
+SUPABASE_READ_URL: Optional[str] = os.getenv("SUPABASE_READ_URL")
+SUPABASE_READ_KEY: Optional[str] = os.getenv("SUPABASE_READ_KEY") or SUPABASE_KEY
+READ_YOUR_WRITES_SECONDS: float = float(os.getenv("READ_YOUR_WRITES_SECONDS", "5"))
+REPLICA_MAX_LAG_SECONDS: float = float(os.getenv("REPLICA_MAX_LAG_SECONDS", "10"))
+REPLICA_LAG_CHECK_SECONDS: float = float(os.getenv("REPLICA_LAG_CHECK_SECONDS", "5"))
+# Rows per page for fetch_all; must not exceed PostgREST's max-rows (1000 on Supabase).
+SUPABASE_PAGE_SIZE: int = int(os.getenv("SUPABASE_PAGE_SIZE", "1000"))
+
 if not SUPABASE_URL or not SUPABASE_KEY:
     raise EnvironmentError(
         "Supabase URL and Key must be set in your .env file (SUPABASE_URL, SUPABASE_KEY)."
@@ -27,9 +39,82 @@ except Exception as exc:
     raise EnvironmentError("Failed to initialize Supabase client.") from exc
 
 
+read_replica: Optional[Client] = None
+if SUPABASE_READ_URL:
+    try:
+        read_replica = create_client(SUPABASE_READ_URL, SUPABASE_READ_KEY)
+        logger.info("Supabase read replica client initialized; routing reads to replica.")
+    except Exception as exc:
+        logger.exception("Failed to initialize Supabase read replica client.")
+        raise EnvironmentError("Failed to initialize Supabase read replica client.") from exc
+
+QUERY_ADVISOR: bool = os.getenv("QUERY_ADVISOR", "").lower() in ("1", "true", "yes")
+
+
+def _build_client(primary: Client, replica: Optional[Client] = None):
+    client = primary
+    if replica is not None:
+        client = RoutingClient(
+            primary,
+            replica,
+            sticky_seconds=READ_YOUR_WRITES_SECONDS,
+            max_lag_seconds=REPLICA_MAX_LAG_SECONDS,
+            lag_monitor=ReplicaLagMonitor(rpc_lag_probe(replica), REPLICA_LAG_CHECK_SECONDS),
+        )
+    # Times queries for requests being profiled; a contextvar lookup otherwise.
+    client = TracedClient(client)
+    if QUERY_ADVISOR:
+        from .query_advisor import RecordingClient, recorder
+        client = RecordingClient(client, recorder)
+    return client
+
+
+_client = _build_client(supabase, read_replica)
+_primary = TracedClient(supabase)
+if QUERY_ADVISOR:
+    logger.info("Query advisor enabled; filter patterns will be reported on shutdown.")
+
+
+def configure_clients(primary: Client, replica: Optional[Client] = None) -> None:
+    """
+    Replace the primary and (optional) replica clients, e.g. with local
+    stand-ins in tests.
+    """
+    global supabase, read_replica, _client, _primary
+    supabase = primary
+    read_replica = replica
+    _client = _build_client(primary, replica)
+    _primary = TracedClient(primary)
+
+
 def get_supabase_client() -> Client:
 
-    return supabase
+    return _client
+
+
+def get_primary_client() -> Client:
+    """Client that always talks to the primary, bypassing read routing."""
+    return _primary
+
+
+def fetch_all(query: Callable[[], Any], order_column: str, error_detail: str = "DB error fetching rows") -> List[Dict[str, Any]]:
+    """
+    Run a select to completion in SUPABASE_PAGE_SIZE pages ordered by
+    order_column, so results are not silently cut off at max-rows.
+    query() must return a fresh filtered builder for each page.
+    """
+    rows: List[Dict[str, Any]] = []
+    start = 0
+    while True:
+        resp = query().order(order_column).range(start, start + SUPABASE_PAGE_SIZE - 1).execute()
+        if getattr(resp, "error", None):
+            logger.error("%s: %s", error_detail, resp.error)
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail=error_detail)
+        page = resp.data or []
+        rows.extend(page)
+        if len(page) < SUPABASE_PAGE_SIZE:
+            return rows
+        start += SUPABASE_PAGE_SIZE
 
 
-__all__ = ["supabase", "get_supabase_client"]
+__all__ = ["supabase", "get_supabase_client", "get_primary_client", "configure_clients", "fetch_all"]
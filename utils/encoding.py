@@ -0,0 +1,211 @@
+# python
+# File: utils/encoding.py
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+import anyio.to_thread
+
+try:
+    import brotli
+except ImportError:  # pragma: no cover - optional dependency
+    brotli = None
+
+try:
+    import msgpack
+except ImportError:  # pragma: no cover - optional dependency
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+ENCODING_MIN_SIZE = int(os.getenv("RESPONSE_COMPRESS_MIN_BYTES", "1024"))
+ENCODING_CACHE_BYTES = int(os.getenv("RESPONSE_ENCODING_CACHE_BYTES", str(32 * 1024 * 1024)))
+# Bodies at least this large are encoded in a worker thread instead of on the event loop.
+ENCODING_OFFLOAD_SIZE = int(os.getenv("RESPONSE_ENCODING_OFFLOAD_BYTES", str(64 * 1024)))
+GZIP_LEVEL = int(os.getenv("RESPONSE_GZIP_LEVEL", "6"))
+BROTLI_QUALITY = int(os.getenv("RESPONSE_BROTLI_QUALITY", "5"))
+
+MSGPACK_MEDIA_TYPE = "application/msgpack"
+
+
+def _parse_quality_list(header: str) -> Dict[str, float]:
+    """Parse 'a;q=0.5, b' style headers into {token: q}."""
+    accepted: Dict[str, float] = {}
+    for part in header.split(","):
+        token, _, params = part.strip().partition(";")
+        token = token.strip().lower()
+        if not token:
+            continue
+        q = 1.0
+        for param in params.split(";"):
+            key, _, value = param.strip().partition("=")
+            if key == "q":
+                try:
+                    q = float(value)
+                except ValueError:
+                    q = 0.0
+        accepted[token] = q
+    return accepted
+
+
+def choose_format(accept: str) -> str:
+    """'msgpack' when the client prefers MessagePack over JSON, else 'json'."""
+    if msgpack is None or not accept:
+        return "json"
+    accepted = _parse_quality_list(accept)
+    msgpack_q = max(accepted.get(MSGPACK_MEDIA_TYPE, 0.0), accepted.get("application/x-msgpack", 0.0))
+    json_q = max(accepted.get("application/json", 0.0), accepted.get("*/*", 0.0) * 0.99)
+    return "msgpack" if msgpack_q > 0 and msgpack_q >= json_q else "json"
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    accepted = _parse_quality_list(accept_encoding or "")
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def encode_body(body: bytes, fmt: str, encoding: Optional[str]) -> bytes:
+    if fmt == "msgpack":
+        body = msgpack.packb(json.loads(body), use_bin_type=True)
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    if encoding == "gzip":
+        return gzip.compress(body, compresslevel=GZIP_LEVEL)
+    return body
+
+
+class EncodedResponseCache:
+    """
+    LRU of already-encoded bodies keyed by (digest of the JSON body, format,
+    encoding), bounded by total bytes. Cached responses (e.g. the dashboard)
+    produce identical JSON, so they are only compressed once.
+    """
+
+    def __init__(self, max_bytes: int = ENCODING_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[Tuple[bytes, str, Optional[str]], bytes]" = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+
+    def get(self, key) -> Optional[bytes]:
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value: bytes) -> None:
+        if len(value) > self.max_bytes // 4:
+            return
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            self._entries[key] = value
+            self._size += len(value)
+            while self._size > self.max_bytes:
+                _, evicted = self._entries.popitem(last=False)
+                self._size -= len(evicted)
+
+
+class NegotiatedEncodingMiddleware:
+    """
+    ASGI middleware that re-encodes JSON responses per request headers:
+    MessagePack for `Accept: application/msgpack`, then brotli or gzip for
+    bodies of at least min_size bytes. Adds a strong ETag of the encoded
+    body and answers matching If-None-Match with 304. Streaming and
+    non-JSON responses pass through untouched.
+    """
+
+    def __init__(self, app, min_size: int = ENCODING_MIN_SIZE, cache: Optional[EncodedResponseCache] = None):
+        self.app = app
+        self.min_size = min_size
+        self.cache = cache if cache is not None else EncodedResponseCache()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        request_headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in scope["headers"]}
+        fmt = choose_format(request_headers.get("accept", ""))
+        encoding = choose_encoding(request_headers.get("accept-encoding", ""))
+        if_none_match = request_headers.get("if-none-match")
+
+        start_message = None
+        chunks: List[bytes] = []
+        passthrough = False
+
+        async def send_wrapper(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = {key.decode("latin-1").lower(): value.decode("latin-1") for key, value in message.get("headers", [])}
+                content_type = headers.get("content-type", "")
+                if not content_type.startswith("application/json") or "content-encoding" in headers:
+                    passthrough = True
+                    await send(message)
+                    return
+                start_message = message
+                return
+            if message["type"] == "http.response.body":
+                chunks.append(message.get("body", b""))
+                if message.get("more_body", False):
+                    return
+                await self._send_encoded(send, start_message, b"".join(chunks), fmt, encoding, if_none_match)
+                return
+            await send(message)
+
+        await self.app(scope, receive, send_wrapper)
+
+    async def _send_encoded(self, send, start_message, body: bytes, fmt: str, encoding: Optional[str],
+                            if_none_match: Optional[str]) -> None:
+        if len(body) < self.min_size:
+            encoding = None
+        key = (hashlib.blake2b(body, digest_size=16).digest(), fmt, encoding)
+        encoded = self.cache.get(key)
+        if encoded is None:
+            try:
+                if len(body) >= ENCODING_OFFLOAD_SIZE:
+                    encoded = await anyio.to_thread.run_sync(encode_body, body, fmt, encoding)
+                else:
+                    encoded = encode_body(body, fmt, encoding)
+            except Exception:
+                logger.exception("Failed to encode response as %s/%s; sending JSON", fmt, encoding)
+                fmt, encoding, encoded = "json", None, body
+            self.cache.set(key, encoded)
+        etag = '"' + key[0].hex() + "-" + fmt + ("-" + encoding if encoding else "") + '"'
+
+        headers = [
+            (name, value) for name, value in start_message.get("headers", [])
+            if name.lower() not in (b"content-length", b"content-type", b"etag", b"vary")
+        ]
+        headers.append((b"vary", b"Accept, Accept-Encoding"))
+        headers.append((b"etag", etag.encode("latin-1")))
+        status_code = start_message["status"]
+
+        if if_none_match and status_code == 200 and etag in [tag.strip() for tag in if_none_match.split(",")]:
+            await send({"type": "http.response.start", "status": 304, "headers": headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        content_type = MSGPACK_MEDIA_TYPE if fmt == "msgpack" else "application/json"
+        headers.append((b"content-type", content_type.encode("latin-1")))
+        if encoding:
+            headers.append((b"content-encoding", encoding.encode("latin-1")))
+        headers.append((b"content-length", str(len(encoded)).encode("latin-1")))
+        await send({"type": "http.response.start", "status": status_code, "headers": headers})
+        await send({"type": "http.response.body", "body": encoded})
+
+
+__all__ = ["NegotiatedEncodingMiddleware", "EncodedResponseCache", "choose_format", "choose_encoding", "encode_body"]
@@ -0,0 +1,192 @@
+# python
+# File: utils/jobs.py
+import contextvars
+import logging
+import os
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+from typing import Any, Callable, Dict, Optional
+from fastapi import HTTPException, status
+from pydantic_core import to_jsonable_python
+from models.schema import Job, JobStatus
+
+logger = logging.getLogger(__name__)
+
+JOB_WORKERS = int(os.getenv("JOB_WORKERS", "4"))
+JOB_MAX_PENDING = int(os.getenv("JOB_MAX_PENDING", "100"))
+JOB_CHUNK_SIZE = int(os.getenv("JOB_CHUNK_SIZE", "200"))
+
+# progress(processed, total)
+ProgressCallback = Callable[[int, int], None]
+JobHandler = Callable[[str, Dict[str, Any], ProgressCallback], Dict[str, Any]]
+
+
+class JobStore(ABC):
+    """Persistence for job state. Implementations must be thread-safe."""
+
+    @abstractmethod
+    def create(self, job: Job) -> None:
+        ...
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Job]:
+        ...
+
+    @abstractmethod
+    def update(self, job_id: str, **fields: Any) -> None:
+        ...
+
+
+class InMemoryJobStore(JobStore):
+    """
+    Process-local store for development and tests. Keeps at most max_jobs,
+    evicting the oldest finished jobs first.
+    """
+
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Job]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def create(self, job: Job) -> None:
+        with self._lock:
+            self._jobs[job.job_id] = job
+            if len(self._jobs) > self.max_jobs:
+                for job_id, existing in list(self._jobs.items()):
+                    if existing.status in (JobStatus.SUCCEEDED, JobStatus.FAILED):
+                        del self._jobs[job_id]
+                        if len(self._jobs) <= self.max_jobs:
+                            break
+
+    def get(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            return job.model_copy() if job else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None:
+                self._jobs[job_id] = job.model_copy(update=fields)
+
+
+class SupabaseJobStore(JobStore):
+    """
+    Stores jobs in the `jobs` table (migrations/002_jobs.sql) so status
+    survives restarts and is visible from every API worker.
+    """
+
+    def create(self, job: Job) -> None:
+        from utils.database import get_supabase_client
+        resp = get_supabase_client().table("jobs").insert(job.model_dump(mode="json")).execute()
+        if getattr(resp, "error", None):
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to create job")
+
+    def get(self, job_id: str) -> Optional[Job]:
+        from utils.database import get_supabase_client
+        resp = get_supabase_client().table("jobs").select("*").eq("job_id", job_id).execute()
+        if getattr(resp, "error", None):
+            raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="DB error fetching job")
+        return Job(**resp.data[0]) if resp.data else None
+
+    def update(self, job_id: str, **fields: Any) -> None:
+        from utils.database import get_supabase_client
+        payload = to_jsonable_python(fields)
+        resp = get_supabase_client().table("jobs").update(payload).eq("job_id", job_id).execute()
+        if getattr(resp, "error", None):
+            logger.error("Failed to update job %s: %s", job_id, resp.error)
+
+
+class JobQueue:
+    """
+    Runs job handlers on a bounded thread pool. Submissions beyond
+    max_pending queued or running jobs are rejected with 503.
+    """
+
+    def __init__(self, store: JobStore, workers: int = JOB_WORKERS, max_pending: int = JOB_MAX_PENDING):
+        self.store = store
+        self.workers = workers
+        self.max_pending = max_pending
+        self._executor: Optional[ThreadPoolExecutor] = None
+        self._pending = 0
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> ThreadPoolExecutor:
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+        return self._executor
+
+    def submit(self, kind: str, teacher_id: str, handler: JobHandler, payload: Dict[str, Any], total: int = 0) -> Job:
+        with self._lock:
+            if self._pending >= self.max_pending:
+                raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Job queue is full, retry later")
+            self._pending += 1
+
+        job = Job(job_id=uuid.uuid4().hex, kind=kind, teacher_id=teacher_id, total=total)
+        try:
+            self.store.create(job)
+            # Carry the request context (e.g. read-your-writes session) into the worker.
+            context = contextvars.copy_context()
+            self._get_executor().submit(context.run, self._run, job.job_id, teacher_id, handler, payload)
+        except Exception:
+            with self._lock:
+                self._pending -= 1
+            raise
+        return job
+
+    def _run(self, job_id: str, teacher_id: str, handler: JobHandler, payload: Dict[str, Any]) -> None:
+        def progress(processed: int, total: int) -> None:
+            self.store.update(job_id, processed=processed, total=total)
+
+        try:
+            self.store.update(job_id, status=JobStatus.RUNNING)
+            result = handler(teacher_id, payload, progress)
+            self.store.update(job_id, status=JobStatus.SUCCEEDED, result=result, finished_at=datetime.utcnow())
+        except HTTPException as exc:
+            self.store.update(job_id, status=JobStatus.FAILED, error=str(exc.detail), finished_at=datetime.utcnow())
+        except Exception as exc:
+            logger.exception("Job %s failed", job_id)
+            self.store.update(job_id, status=JobStatus.FAILED, error=str(exc), finished_at=datetime.utcnow())
+        finally:
+            with self._lock:
+                self._pending -= 1
+
+    def get(self, job_id: str, teacher_id: str) -> Job:
+        job = self.store.get(job_id)
+        if job is None or job.teacher_id != teacher_id:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+        return job
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=True)
+            self._executor = None
+
+
+def _default_store() -> JobStore:
+    if os.getenv("JOB_STORE", "memory").lower() == "supabase":
+        return SupabaseJobStore()
+    return InMemoryJobStore()
+
+
+job_queue = JobQueue(_default_store())
+
+
+def configure_job_store(store: JobStore) -> None:
+    """Swap the store backing the shared job queue (e.g. in tests)."""
+    job_queue.store = store
+
+
+__all__ = [
+    "JobStore",
+    "InMemoryJobStore",
+    "SupabaseJobStore",
+    "JobQueue",
+    "job_queue",
+    "configure_job_store",
+    "JOB_CHUNK_SIZE",
+]
@@ -0,0 +1,325 @@
+# python
+# File: utils/profiler.py
+"""
+Opt-in sampling profiler with slow-request capture.
+
+While enabled, a daemon thread samples every thread's stack each
+interval_ms and aggregates them as folded stacks (flamegraph.pl /
+speedscope input). ProfilerMiddleware tracks in-flight requests; samples
+whose stack passes through a request's middleware frame, or that come from
+a worker thread currently running work for the request (threadpool calls,
+or any thread that queried Supabase under the request's context), are
+attributed to that request, and requests slower than threshold_ms are kept as captures
+together with the Supabase calls they made. When disabled the middleware
+and client wrapper reduce to a flag check and a contextvar lookup.
+"""
+import asyncio
+import contextvars
+import itertools
+import logging
+import os
+import sys
+import threading
+import time
+from collections import Counter, deque
+from typing import Any, Deque, Dict, List, Optional
+
+import anyio.to_thread
+
+logger = logging.getLogger(__name__)
+
+PROFILER_ENABLED = os.getenv("PROFILER_ENABLED", "").lower() in ("1", "true", "yes")
+PROFILER_INTERVAL_MS = float(os.getenv("PROFILER_INTERVAL_MS", "10"))
+PROFILER_THRESHOLD_MS = float(os.getenv("PROFILER_THRESHOLD_MS", "500"))
+PROFILER_MAX_CAPTURES = int(os.getenv("PROFILER_MAX_CAPTURES", "50"))
+PROFILER_MAX_STACKS = 20000
+
+_trace: contextvars.ContextVar[Optional["RequestTrace"]] = contextvars.ContextVar("profiler_trace", default=None)
+
+
+def _frame_label(frame) -> str:
+    code = frame.f_code
+    module = frame.f_globals.get("__name__", os.path.basename(code.co_filename))
+    return f"{module}:{code.co_name}:{frame.f_lineno}"
+
+
+class RequestTrace:
+    __slots__ = ("method", "path", "started", "db_calls", "samples")
+
+    def __init__(self, method: str, path: str):
+        self.method = method
+        self.path = path
+        self.started = time.perf_counter()
+        self.db_calls: List[Dict[str, Any]] = []
+        self.samples: Counter = Counter()
+
+
+class SamplingProfiler:
+    def __init__(self, interval_ms: float = PROFILER_INTERVAL_MS, threshold_ms: float = PROFILER_THRESHOLD_MS,
+                 max_captures: int = PROFILER_MAX_CAPTURES):
+        self.interval_ms = interval_ms
+        self.threshold_ms = threshold_ms
+        self.enabled = False
+        self.stacks: Counter = Counter()
+        self.captures: Deque[Dict[str, Any]] = deque(maxlen=max_captures)
+        self._active: Dict[int, RequestTrace] = {}  # id(middleware frame) -> trace
+        self._threads: Dict[int, RequestTrace] = {}  # worker thread ident -> trace
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def configure(self, enabled: Optional[bool] = None, interval_ms: Optional[float] = None,
+                  threshold_ms: Optional[float] = None) -> Dict[str, Any]:
+        if interval_ms is not None:
+            self.interval_ms = max(1.0, interval_ms)
+        if threshold_ms is not None:
+            self.threshold_ms = max(0.0, threshold_ms)
+        if enabled is True:
+            self.start()
+        elif enabled is False:
+            self.stop()
+        return self.status()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "enabled": self.enabled,
+            "interval_ms": self.interval_ms,
+            "threshold_ms": self.threshold_ms,
+            "captures": len(self.captures),
+            "distinct_stacks": len(self.stacks),
+            "active_requests": len(self._active),
+        }
+
+    def start(self) -> None:
+        if self._thread is not None and self._thread.is_alive():
+            self.enabled = True
+            return
+        self._stop.clear()
+        self.enabled = True
+        # Bind threadpool workers to their request only while sampling.
+        anyio.to_thread.run_sync = _traced_run_sync
+        self._thread = threading.Thread(target=self._run, name="profiler-sampler", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self.enabled = False
+        if anyio.to_thread.run_sync is _traced_run_sync:
+            anyio.to_thread.run_sync = _run_sync
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+            self._thread = None
+
+    def reset(self) -> None:
+        with self._lock:
+            self.stacks.clear()
+            self.captures.clear()
+
+    def _run(self) -> None:
+        own = threading.get_ident()
+        while not self._stop.wait(self.interval_ms / 1000.0):
+            frames = sys._current_frames()
+            with self._lock:
+                active = dict(self._active)
+                threads = dict(self._threads)
+            for thread_id, frame in frames.items():
+                if thread_id == own:
+                    continue
+                labels = []
+                owner = None
+                while frame is not None:
+                    if owner is None:
+                        owner = active.get(id(frame))
+                    labels.append(_frame_label(frame))
+                    frame = frame.f_back
+                folded = ";".join(reversed(labels))
+                with self._lock:
+                    if folded in self.stacks or len(self.stacks) < PROFILER_MAX_STACKS:
+                        self.stacks[folded] += 1
+                if owner is None:
+                    owner = threads.get(thread_id)
+                if owner is not None:
+                    owner.samples[folded] += 1
+            del frames
+
+    # --- request tracking (used by ProfilerMiddleware) ---
+
+    def begin(self, frame, method: str, path: str) -> RequestTrace:
+        trace = RequestTrace(method, path)
+        with self._lock:
+            self._active[id(frame)] = trace
+        return trace
+
+    def bind_thread(self, trace: RequestTrace) -> None:
+        """
+        Attribute samples from the current worker thread to trace. The event
+        loop thread is never bound: it interleaves many requests and is
+        attributed through the middleware frame instead.
+        """
+        try:
+            asyncio.get_running_loop()
+            return
+        except RuntimeError:
+            pass
+        with self._lock:
+            self._threads[threading.get_ident()] = trace
+
+    def unbind_thread(self, trace: RequestTrace) -> None:
+        with self._lock:
+            if self._threads.get(threading.get_ident()) is trace:
+                del self._threads[threading.get_ident()]
+
+    def end(self, frame, trace: RequestTrace, status_code: Optional[int]) -> None:
+        with self._lock:
+            self._active.pop(id(frame), None)
+            for thread_id in [tid for tid, owner in self._threads.items() if owner is trace]:
+                del self._threads[thread_id]
+        duration_ms = (time.perf_counter() - trace.started) * 1000
+        if duration_ms < self.threshold_ms:
+            return
+        capture = {
+            "id": next(self._ids),
+            "method": trace.method,
+            "path": trace.path,
+            "status": status_code,
+            "duration_ms": round(duration_ms, 2),
+            "db_time_ms": round(sum(call["duration_ms"] for call in trace.db_calls), 2),
+            "db_calls": list(trace.db_calls),
+            "samples": dict(trace.samples),
+            "captured_at": time.time(),
+        }
+        with self._lock:
+            self.captures.append(capture)
+        logger.warning("Slow request %s %s took %.1f ms (%d DB calls)", trace.method, trace.path,
+                       duration_ms, len(trace.db_calls))
+
+    def get_capture(self, capture_id: int) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            for capture in self.captures:
+                if capture["id"] == capture_id:
+                    return capture
+        return None
+
+    def folded(self, capture_id: Optional[int] = None) -> Optional[str]:
+        """Folded stacks ("frame;frame;frame count" per line) for flamegraph tools."""
+        if capture_id is None:
+            with self._lock:
+                stacks = dict(self.stacks)
+        else:
+            capture = self.get_capture(capture_id)
+            if capture is None:
+                return None
+            stacks = capture["samples"]
+        return "".join(f"{stack} {count}\n" for stack, count in sorted(stacks.items()))
+
+
+profiler = SamplingProfiler()
+
+
+_run_sync = anyio.to_thread.run_sync
+
+
+async def _traced_run_sync(func, *args, **kwargs):
+    # Installed over anyio.to_thread.run_sync by SamplingProfiler.start() and
+    # removed by stop(). Starlette's run_in_threadpool (sync routes and
+    # dependencies, iterate_in_threadpool) goes through it, and Starlette has
+    # no hook of its own for threadpool calls; bind the worker thread for the call.
+    trace = _trace.get()
+    if trace is None:
+        return await _run_sync(func, *args, **kwargs)
+
+    def bound(*call_args):
+        profiler.bind_thread(trace)
+        try:
+            return func(*call_args)
+        finally:
+            profiler.unbind_thread(trace)
+
+    return await _run_sync(bound, *args, **kwargs)
+
+
+class ProfilerMiddleware:
+    """ASGI middleware registering each request with the profiler while it is enabled."""
+
+    def __init__(self, app, profiler: SamplingProfiler = profiler):
+        self.app = app
+        self.profiler = profiler
+
+    async def __call__(self, scope, receive, send):
+        if not self.profiler.enabled or scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        frame = sys._getframe()
+        trace = self.profiler.begin(frame, scope.get("method", ""), scope.get("path", ""))
+        token = _trace.set(trace)
+        status_code = None
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _trace.reset(token)
+            self.profiler.end(frame, trace, status_code)
+
+
+class _TracedQuery:
+    """Proxy over a postgrest builder timing execute() for the current request."""
+
+    def __init__(self, builder: Any, table: str, trace: RequestTrace):
+        self._builder = builder
+        self._table = table
+        self._trace = trace
+        self._ops: List[str] = []
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            if name == "execute":
+                started = time.perf_counter()
+                try:
+                    return attr(*args, **kwargs)
+                finally:
+                    self._trace.db_calls.append({
+                        "table": self._table,
+                        "query": ".".join(self._ops),
+                        "duration_ms": round((time.perf_counter() - started) * 1000, 3),
+                    })
+            self._ops.append(f"{name}({args[0]})" if args and isinstance(args[0], str) else name)
+            self._builder = attr(*args, **kwargs)
+            return self
+
+        return call
+
+
+class TracedClient:
+    """
+    Supabase client wrapper that times queries made while a request is being
+    profiled; otherwise table() hands back the plain builder.
+    """
+
+    def __init__(self, client: Any):
+        self._client = client
+
+    def table(self, name: str) -> Any:
+        trace = _trace.get()
+        if trace is None:
+            return self._client.table(name)
+        # Work fanned out to our own executors runs under a copied context.
+        profiler.bind_thread(trace)
+        return _TracedQuery(self._client.table(name), name, trace)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+__all__ = ["SamplingProfiler", "ProfilerMiddleware", "TracedClient", "profiler", "PROFILER_ENABLED"]
@@ -0,0 +1,184 @@
+# python
+# File: utils/query_advisor.py
+"""
+Records the filter patterns issued through the Supabase client and flags
+those with no supporting index in migrations/*.sql.
+
+Enable with QUERY_ADVISOR=1; the report is logged on shutdown and can be
+printed offline with `python -m utils.query_advisor` to list known indexes.
+"""
+import logging
+import re
+import threading
+from collections import Counter
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parent.parent / "migrations"
+
+# Primary keys are indexed implicitly.
+PRIMARY_KEYS: Dict[str, str] = {
+    "teachers": "id",
+    "students": "id",
+    "course": "course_id",
+    "modules": "module_id",
+    "course_materials": "material_id",
+    "assignments": "assignment_id",
+    "results": "result_id",
+    "live_classes": "class_id",
+    "feedback": "feedback_id",
+    "attendance": "attendance_id",
+    "sync_log": "change_id",
+    "jobs": "job_id",
+    "audit_log": "audit_id",
+}
+
+_EQUALITY_OPS = {"eq", "in_", "is_"}
+_RANGE_OPS = {"gt", "gte", "lt", "lte", "like", "ilike", "neq"}
+_INDEX_RE = re.compile(
+    r"create\s+(?:unique\s+)?index\s+(?:if\s+not\s+exists\s+)?(\w+)\s+on\s+(\w+)\s*\(([^)]*)\)",
+    re.IGNORECASE,
+)
+
+# (table, equality columns, range columns, order column)
+QueryPattern = Tuple[str, Tuple[str, ...], Tuple[str, ...], Optional[str]]
+
+
+def load_index_catalogue(migrations_dir: Path = MIGRATIONS_DIR) -> Dict[str, List[Tuple[str, List[str]]]]:
+    """Map table -> [(index name, [columns])] from primary keys and migration files."""
+    catalogue: Dict[str, List[Tuple[str, List[str]]]] = {
+        table: [(f"{table}_pkey", [column])] for table, column in PRIMARY_KEYS.items()
+    }
+    for path in sorted(migrations_dir.glob("*.sql")):
+        for name, table, columns in _INDEX_RE.findall(path.read_text()):
+            cols = [col.strip().split()[0] for col in columns.split(",") if col.strip()]
+            catalogue.setdefault(table, []).append((name, cols))
+    return catalogue
+
+
+def find_supporting_index(pattern: QueryPattern, catalogue: Dict[str, List[Tuple[str, List[str]]]]) -> Optional[str]:
+    """
+    Return the index best matching the pattern: the one whose leading columns
+    cover the most equality filters, optionally followed by a range/order
+    column. None when no index can seek on any filtered column.
+    """
+    table, eq_cols, range_cols, order_col = pattern
+    best, best_score = None, 0
+    for name, cols in catalogue.get(table, []):
+        score = 0
+        for col in cols:
+            if col in eq_cols:
+                score += 2
+                continue
+            if col in range_cols or col == order_col:
+                score += 1
+            break
+        if score > best_score:
+            best, best_score = name, score
+    return best
+
+
+class QueryRecorder:
+    def __init__(self):
+        self._patterns: Counter = Counter()
+        self._lock = threading.Lock()
+
+    def record(self, pattern: QueryPattern) -> None:
+        with self._lock:
+            self._patterns[pattern] += 1
+
+    def patterns(self) -> Dict[QueryPattern, int]:
+        with self._lock:
+            return dict(self._patterns)
+
+    def report(self, catalogue: Optional[Dict[str, List[Tuple[str, List[str]]]]] = None) -> List[Dict[str, Any]]:
+        catalogue = catalogue if catalogue is not None else load_index_catalogue()
+        rows = []
+        for pattern, count in sorted(self.patterns().items(), key=lambda item: -item[1]):
+            table, eq_cols, range_cols, order_col = pattern
+            index = find_supporting_index(pattern, catalogue)
+            rows.append({
+                "table": table,
+                "equality": list(eq_cols),
+                "range": list(range_cols),
+                "order": order_col,
+                "count": count,
+                "index": index,
+                "unindexed": index is None and bool(eq_cols or range_cols or order_col),
+            })
+        return rows
+
+    def log_report(self) -> None:
+        for row in self.report():
+            log = logger.warning if row["unindexed"] else logger.info
+            log("query %s eq=%s range=%s order=%s x%d -> %s", row["table"], row["equality"], row["range"],
+                row["order"], row["count"], row["index"] or "NO INDEX")
+
+
+class _RecordingQuery:
+    """Proxy over a postgrest request builder that notes filters until execute()."""
+
+    def __init__(self, builder: Any, table: str, recorder: QueryRecorder):
+        self._builder = builder
+        self._table = table
+        self._recorder = recorder
+        self._eq: set = set()
+        self._range: set = set()
+        self._order: Optional[str] = None
+
+    def __getattr__(self, name: str) -> Any:
+        attr = getattr(self._builder, name)
+        if not callable(attr):
+            return attr
+
+        def call(*args, **kwargs):
+            if name in _EQUALITY_OPS and args:
+                self._eq.add(args[0])
+            elif name in _RANGE_OPS and args:
+                self._range.add(args[0])
+            elif name == "order" and args and self._order is None:
+                self._order = args[0]
+            if name == "execute":
+                self._recorder.record((
+                    self._table, tuple(sorted(self._eq)), tuple(sorted(self._range)), self._order,
+                ))
+                return attr(*args, **kwargs)
+            result = attr(*args, **kwargs)
+            self._builder = result
+            return self
+
+        return call
+
+
+class RecordingClient:
+    """Wraps a Supabase client so every table() query is recorded."""
+
+    def __init__(self, client: Any, recorder: QueryRecorder):
+        self._client = client
+        self.recorder = recorder
+
+    def table(self, name: str) -> _RecordingQuery:
+        return _RecordingQuery(self._client.table(name), name, self.recorder)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self._client, name)
+
+
+recorder = QueryRecorder()
+
+
+__all__ = [
+    "QueryRecorder",
+    "RecordingClient",
+    "recorder",
+    "load_index_catalogue",
+    "find_supporting_index",
+]
+
+
+if __name__ == "__main__":
+    for table, indexes in sorted(load_index_catalogue().items()):
+        for name, cols in indexes:
+            print(f"{table:18} {name:40} ({', '.join(cols)})")
@@ -0,0 +1,238 @@
+# python
+# File: utils/read_routing.py
+import contextvars
+import logging
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_WRITE_OPS = {"insert", "update", "upsert", "delete"}
+
+# Identifies the caller for read-your-writes; set by verify_teacher.
+current_session: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("current_session", default=None)
+# Wall-clock time of the caller's last write as reported by the client, so
+# stickiness holds when the follow-up read lands on another worker.
+_client_last_write: contextvars.ContextVar[Optional[float]] = contextvars.ContextVar("client_last_write", default=None)
+# Per-request holder ReadYourWritesMiddleware reads to report writes back.
+_request_writes: contextvars.ContextVar[Optional[Dict[str, float]]] = contextvars.ContextVar("request_writes", default=None)
+
+LAST_WRITE_COOKIE = "last_write"
+LAST_WRITE_HEADER = "X-Last-Write"
+
+
+def set_session(session_id: Optional[str], last_write: Optional[str] = None) -> None:
+    current_session.set(session_id)
+    try:
+        # Values from the future are clamped so a bad clock can't pin reads to the primary.
+        _client_last_write.set(min(float(last_write), time.time()) if last_write else None)
+    except ValueError:
+        _client_last_write.set(None)
+
+
+class ReplicaLagMonitor:
+    """
+    Periodically asks the replica how far behind it is via the
+    replica_lag_seconds() function (migrations/004_replica_lag.sql).
+    A failed probe marks the replica unhealthy until the next check.
+    """
+
+    def __init__(self, probe: Callable[[], float], check_interval: float):
+        self._probe = probe
+        self.check_interval = check_interval
+        self._lag: Optional[float] = None
+        self._checked_at = float("-inf")
+        self._lock = threading.Lock()
+
+    def lag_seconds(self) -> Optional[float]:
+        """Return the last measured lag, or None if the replica is unhealthy."""
+        now = time.monotonic()
+        if now - self._checked_at < self.check_interval:
+            return self._lag
+        with self._lock:
+            if now - self._checked_at < self.check_interval:
+                return self._lag
+            try:
+                self._lag = float(self._probe())
+            except Exception:
+                logger.warning("Replica lag probe failed; routing reads to primary", exc_info=True)
+                self._lag = None
+            self._checked_at = time.monotonic()
+            return self._lag
+
+
+def rpc_lag_probe(client: Any) -> Callable[[], float]:
+    def probe() -> float:
+        resp = client.rpc("replica_lag_seconds").execute()
+        if getattr(resp, "error", None):
+            raise RuntimeError(resp.error)
+        data = resp.data
+        if isinstance(data, list):
+            data = data[0] if data else 0
+        if isinstance(data, dict):
+            data = next(iter(data.values()), 0)
+        return float(data or 0)
+    return probe
+
+
+class _RoutedQuery:
+    """
+    Records a postgrest call chain and replays it on the chosen client at
+    execute(), so a failed replica read can be retried on the primary.
+    """
+
+    def __init__(self, router: "RoutingClient", table: str):
+        self._router = router
+        self._table = table
+        self._calls: List[Tuple[str, tuple, dict]] = []
+
+    def __getattr__(self, name: str) -> Callable[..., "_RoutedQuery"]:
+        if name.startswith("_"):
+            raise AttributeError(name)
+
+        def call(*args, **kwargs):
+            self._calls.append((name, args, kwargs))
+            return self
+
+        return call
+
+    def _build(self, client: Any) -> Any:
+        builder = client.table(self._table)
+        for name, args, kwargs in self._calls:
+            builder = getattr(builder, name)(*args, **kwargs)
+        return builder
+
+    def execute(self) -> Any:
+        is_write = bool(self._calls) and self._calls[0][0] in _WRITE_OPS
+        if is_write:
+            resp = self._build(self._router.primary).execute()
+            self._router.note_write()
+            return resp
+
+        if not self._router.use_replica():
+            return self._build(self._router.primary).execute()
+        try:
+            resp = self._build(self._router.replica).execute()
+            if not getattr(resp, "error", None):
+                return resp
+            logger.warning("Replica read on %s failed: %s; retrying on primary", self._table, resp.error)
+        except Exception:
+            logger.warning("Replica read on %s failed; retrying on primary", self._table, exc_info=True)
+        return self._build(self._router.primary).execute()
+
+
+class RoutingClient:
+    """
+    Supabase client facade sending table reads to a replica and everything
+    else (writes, rpc, storage, auth) to the primary.
+
+    Reads go to the primary instead when the current session wrote within
+    the read-your-writes window (at least sticky_seconds, widened to the
+    measured lag), or when the replica lags beyond max_lag_seconds or its
+    lag cannot be measured.
+    """
+
+    def __init__(
+            self,
+            primary: Any,
+            replica: Any,
+            sticky_seconds: float = 5.0,
+            max_lag_seconds: float = 10.0,
+            lag_monitor: Optional[ReplicaLagMonitor] = None,
+            max_sessions: int = 10000,
+    ):
+        self.primary = primary
+        self.replica = replica
+        self.sticky_seconds = sticky_seconds
+        self.max_lag_seconds = max_lag_seconds
+        self.lag_monitor = lag_monitor
+        self.max_sessions = max_sessions
+        self._last_write: Dict[str, float] = {}  # session -> time.time() of last write
+        self._lock = threading.Lock()
+
+    def table(self, name: str) -> _RoutedQuery:
+        return _RoutedQuery(self, name)
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.primary, name)
+
+    def rpc(self, *args, **kwargs) -> Any:
+        # RPCs run on the primary and may write (e.g. the module RPCs).
+        self.note_write()
+        return self.primary.rpc(*args, **kwargs)
+
+    def note_write(self) -> None:
+        now = time.time()
+        writes = _request_writes.get()
+        if writes is not None:
+            writes["last_write"] = now
+        session = current_session.get()
+        if session is None:
+            return
+        with self._lock:
+            self._last_write.pop(session, None)
+            self._last_write[session] = now
+            if len(self._last_write) > self.max_sessions:
+                # Dicts keep insertion order, so the first key is the stalest writer.
+                self._last_write.pop(next(iter(self._last_write)))
+
+    def use_replica(self) -> bool:
+        lag = self.lag_monitor.lag_seconds() if self.lag_monitor else 0.0
+        if lag is None or lag > self.max_lag_seconds:
+            return False
+        last_write = _client_last_write.get()
+        session = current_session.get()
+        if session is not None:
+            with self._lock:
+                local = self._last_write.get(session)
+            if local is not None and (last_write is None or local > last_write):
+                last_write = local
+        if last_write is not None and time.time() - last_write < max(self.sticky_seconds, lag):
+            return False
+        return True
+
+
+class ReadYourWritesMiddleware:
+    """
+    ASGI middleware returning the time of a request's last routed write as a
+    cookie and X-Last-Write header. verify_teacher reads it back, so a later
+    read served by another worker still avoids a lagging replica.
+    """
+
+    def __init__(self, app, max_age: int):
+        self.app = app
+        self.max_age = max_age
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        writes: Dict[str, float] = {}
+        token = _request_writes.set(writes)
+
+        async def send_wrapper(message):
+            if message["type"] == "http.response.start" and "last_write" in writes:
+                value = f"{writes['last_write']:.3f}"
+                message = {**message, "headers": list(message.get("headers", [])) + [
+                    (LAST_WRITE_HEADER.lower().encode(), value.encode()),
+                    (b"set-cookie", f"{LAST_WRITE_COOKIE}={value}; Max-Age={self.max_age}; Path=/; HttpOnly; SameSite=Lax".encode()),
+                ]}
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _request_writes.reset(token)
+
+
+__all__ = [
+    "RoutingClient",
+    "ReplicaLagMonitor",
+    "rpc_lag_probe",
+    "current_session",
+    "set_session",
+    "ReadYourWritesMiddleware",
+    "LAST_WRITE_COOKIE",
+    "LAST_WRITE_HEADER",
+]
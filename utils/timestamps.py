@@ -0,0 +1,20 @@
+# python
+# File: utils/timestamps.py
+from datetime import datetime, timezone
+from typing import Any, Optional
+
+
+def parse_timestamp(value: Any) -> Optional[datetime]:
+    """Parse a timestamp from the database as naive UTC."""
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        parsed = value
+    else:
+        parsed = datetime.fromisoformat(str(value).replace("Z", "+00:00"))
+    if parsed.tzinfo is not None:
+        parsed = parsed.astimezone(timezone.utc).replace(tzinfo=None)
+    return parsed
+
+
+__all__ = ["parse_timestamp"]